@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the Monte Carlo estimators: for each street, run independent
+replicates of plain random sampling, of stratified sampling with paired
+opponent deals and (flop onwards) of hybrid sampling over every enumerated
+runout, and report the variance reduction factors at equal deal count.
+With --samplers, time the deck sampler backends against each other instead.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from deck_samplers import DECK_SAMPLERS
+from poker_engine import PokerEngine
+
+# (street, hole card ids, board card ids); hero holds AhKh in every spot
+SPOTS = [
+    ("preflop", [49, 45], []),
+    ("flop", [49, 45], [41, 37, 3]),
+    ("turn", [49, 45], [41, 37, 3, 22]),
+    ("river", [49, 45], [41, 37, 3, 22, 8]),
+]
+
+
+def run_replicates(simulate, hole_cards, community_cards, player_count, iterations, replicates, rng):
+    """Win-rate estimates, mean deals and wall time of `replicates` independent runs"""
+    estimates = []
+    deals = []
+    start_time = time.time()
+    for _ in range(replicates):
+        counts = simulate(hole_cards, community_cards, player_count, iterations, rng)
+        estimates.append(counts[0] / counts[2])
+        deals.append(counts[2])
+    return np.array(estimates), float(np.mean(deals)), time.time() - start_time
+
+
+def benchmark(iterations: int, replicates: int, player_count: int, seed: int):
+    engine = PokerEngine()
+    rng = np.random.default_rng(seed)
+    print(
+        f"{'street':<8} {'var random':>12} {'var strat':>12} {'factor':>8} {'var hybrid':>12} {'factor':>8} "
+        f"{'ms random':>10} {'ms strat':>10} {'ms hybrid':>10}"
+    )
+    for street, hole_cards, community_cards in SPOTS:
+        plain, plain_deals, plain_time = run_replicates(
+            engine._simulate_counts, hole_cards, community_cards, player_count, iterations, replicates, rng
+        )
+        stratified, stratified_deals, stratified_time = run_replicates(
+            engine._stratified_simulate_counts, hole_cards, community_cards, player_count,
+            iterations, replicates, rng
+        )
+        # Scale to the same number of deals before comparing variances
+        plain_variance = plain.var(ddof=1) * plain_deals
+        stratified_variance = stratified.var(ddof=1) * stratified_deals
+        factor = plain_variance / stratified_variance if stratified_variance else float("inf")
+        hybrid_columns = f"{'n/a':>12} {'':>8}"
+        hybrid_time = ""
+        if len(community_cards) >= 3:
+            hybrid, hybrid_deals, hybrid_elapsed = run_replicates(
+                lambda *args: engine._stratified_simulate_counts(*args, enumerate_runouts=True),
+                hole_cards, community_cards, player_count, iterations, replicates, rng
+            )
+            hybrid_variance = hybrid.var(ddof=1) * hybrid_deals
+            hybrid_factor = plain_variance / hybrid_variance if hybrid_variance else float("inf")
+            hybrid_columns = f"{hybrid_variance:>12.5f} {hybrid_factor:>8.2f}"
+            hybrid_time = f"{hybrid_elapsed / replicates * 1000:>10.1f}"
+        print(
+            f"{street:<8} {plain_variance:>12.5f} {stratified_variance:>12.5f} {factor:>8.2f} {hybrid_columns} "
+            f"{plain_time / replicates * 1000:>10.1f} {stratified_time / replicates * 1000:>10.1f} {hybrid_time}"
+        )
+
+
+def benchmark_samplers(iterations: int, replicates: int, seed: int):
+    """Best wall time (ms) of each deck sampler on every street for 2, 6 and 10 players"""
+    player_counts = (2, 6, 10)
+    engines = {name: PokerEngine(deck_sampler=name) for name in DECK_SAMPLERS}
+    header = " ".join(f"{f'{name} x{players}':>16}" for name in engines for players in player_counts)
+    print(f"{'street':<8} {header}")
+    for street, hole_cards, community_cards in SPOTS:
+        timings = []
+        for engine in engines.values():
+            for players in player_counts:
+                best = float("inf")
+                for _ in range(replicates):
+                    rng = np.random.default_rng(seed)
+                    start_time = time.time()
+                    engine._simulate_counts(hole_cards, community_cards, players, iterations, rng)
+                    best = min(best, time.time() - start_time)
+                timings.append(best * 1000)
+        print(f"{street:<8} " + " ".join(f"{timing:>16.1f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000, help="Deals per replicate")
+    parser.add_argument("--replicates", type=int, default=200, help="Independent runs per estimator")
+    parser.add_argument("--players", type=int, default=2, help="Players at the table")
+    parser.add_argument("--seed", type=int, default=7, help="RNG seed")
+    parser.add_argument("--samplers", action="store_true", help="Time the deck sampler backends")
+    args = parser.parse_args()
+
+    if args.samplers:
+        benchmark_samplers(args.iterations, min(args.replicates, 5), args.seed)
+    else:
+        benchmark(args.iterations, args.replicates, args.players, args.seed)
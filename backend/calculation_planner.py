@@ -0,0 +1,168 @@
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from hand_evaluator import COMBO_COUNT
+
+# z-score of the expected errors (95% half-widths, as reported by the engine)
+CONFIDENCE_Z = 1.96
+
+
+@dataclass
+class PlanEstimate:
+    strategy: str  # "cache", "table", "exact", "analytic", "hybrid" or "monte_carlo"
+    estimated_ms: float
+    expected_error: float  # Expected 95% half-width on win % (0 for exact results)
+    iterations: Optional[int] = None  # Deals to simulate (sampled strategies only)
+
+
+class CalculationPlanner:
+    """
+    Cost model of the calculation strategies, used to pick the most accurate
+    one that fits a latency budget.
+
+    The work of a strategy is counted in hand evaluations (runouts x
+    holdings, boards x 1326 combos, or deals x players) and converted to
+    milliseconds with a per-strategy rate. Rates start from reference
+    measurements and follow the measured throughput of every finished
+    calculation (exponential moving average), so estimates track the
+    machine and its current load. Sampled strategies shrink their deal
+    count to fit the budget; the others have a fixed cost. A cached result
+    of the spot is a candidate like any other: it costs only the overhead
+    and carries its own error. analytic_model_error bounds the error of
+    analytic multiway equity by player count. Safe to share between threads.
+    """
+
+    # Reference ms per hand evaluation (measured at 100k-200k deals, 2-10 players)
+    DEFAULT_MS_PER_EVALUATION = {
+        "exact": 1.5e-5,
+        "analytic": 5e-5,
+        "hybrid": 1.8e-4,
+        "monte_carlo": 7e-5,
+    }
+    # Overhead of any calculation (hand description, recommendation, bookkeeping)
+    BASE_MS = 1.0
+    # Building the alias table of one ranged opponent
+    RANGE_SETUP_MS = 0.5
+    # Variance reduction of hybrid over random sampling (benchmark_engine.py, flop and turn)
+    HYBRID_VARIANCE_FACTOR = 4.0
+    # Fewest deals a sampled strategy is planned with, whatever the budget
+    MIN_ITERATIONS = 1000
+    # Weight of the newest measurement in the moving averages
+    SMOOTHING = 0.2
+
+    def __init__(self, analytic_model_error: Dict[int, float]):
+        self.analytic_model_error = analytic_model_error
+        self.ms_per_evaluation: Dict[str, float] = dict(self.DEFAULT_MS_PER_EVALUATION)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def evaluations(strategy: str, community_count: int, player_count: int, iterations: int = 0) -> int:
+        """Hand evaluations done by a strategy on a spot"""
+        remaining = 52 - 2 - community_count
+        cards_needed = 5 - community_count
+        if strategy == "exact":
+            runouts = math.comb(remaining, cards_needed)
+            return runouts * (math.comb(remaining - cards_needed, 2) + 1)
+        if strategy == "analytic":
+            return math.comb(remaining, cards_needed) * COMBO_COUNT
+        return iterations * player_count
+
+    def record(self, strategy: str, evaluations: int, elapsed_ms: float):
+        """Fold the measured throughput of a finished calculation into the rates"""
+        if strategy not in self.ms_per_evaluation or evaluations <= 0:
+            return
+        measured = max(elapsed_ms - self.BASE_MS, 0.0) / evaluations
+        with self._lock:
+            current = self.ms_per_evaluation[strategy]
+            self.ms_per_evaluation[strategy] = (1 - self.SMOOTHING) * current + self.SMOOTHING * measured
+
+    def estimates(
+        self,
+        community_count: int,
+        player_count: int,
+        iterations: int,
+        max_latency_ms: Optional[float] = None,
+        table_trials: Optional[int] = None,
+        ranged_opponents: int = 0,
+        cached_error: Optional[float] = None
+    ) -> List[PlanEstimate]:
+        """
+        Cost and accuracy of every strategy available for a spot.
+
+        table_trials: trials per hand class of the preflop table, None when
+        there is no table. ranged_opponents: opponents dealt from a range
+        rather than at random; such spots can only be simulated.
+        cached_error: win % half-width of the cached result of the spot
+        (0 for exact results), None when nothing is cached.
+        """
+        with self._lock:
+            rates = dict(self.ms_per_evaluation)
+        candidates = []
+        if cached_error is not None:
+            candidates.append(PlanEstimate("cache", self.BASE_MS, cached_error))
+
+        if ranged_opponents:
+            setup_ms = self.BASE_MS + self.RANGE_SETUP_MS * ranged_opponents
+            candidates.append(self._sampled(
+                "monte_carlo", rates, setup_ms, player_count, iterations, max_latency_ms
+            ))
+            return candidates
+
+        if community_count == 0 and table_trials:
+            candidates.append(PlanEstimate("table", self.BASE_MS, CONFIDENCE_Z * 50 / math.sqrt(table_trials)))
+        if community_count >= 3:
+            if player_count == 2:
+                work = self.evaluations("exact", community_count, player_count)
+                candidates.append(PlanEstimate("exact", self.BASE_MS + work * rates["exact"], 0.0))
+            else:
+                work = self.evaluations("analytic", community_count, player_count)
+                candidates.append(PlanEstimate(
+                    "analytic", self.BASE_MS + work * rates["analytic"], self.analytic_model_error[player_count]
+                ))
+            # Hybrid deals two boards of two opponent deals per runout at least
+            runouts = math.comb(52 - 2 - community_count, 5 - community_count)
+            candidates.append(self._sampled(
+                "hybrid", rates, self.BASE_MS, player_count, iterations, max_latency_ms,
+                variance_factor=self.HYBRID_VARIANCE_FACTOR, deal_multiple=2 * runouts
+            ))
+        candidates.append(self._sampled(
+            "monte_carlo", rates, self.BASE_MS, player_count, iterations, max_latency_ms
+        ))
+        return candidates
+
+    def _sampled(
+        self,
+        strategy: str,
+        rates: Dict[str, float],
+        fixed_ms: float,
+        player_count: int,
+        iterations: int,
+        max_latency_ms: Optional[float],
+        variance_factor: float = 1.0,
+        deal_multiple: int = 1
+    ) -> PlanEstimate:
+        """
+        Sampled strategy with as many deals (up to `iterations`) as the budget
+        allows, in whole multiples of deal_multiple
+        """
+        ms_per_deal = player_count * rates[strategy]
+        if max_latency_ms is not None:
+            affordable = int((max_latency_ms - fixed_ms) / ms_per_deal)
+            iterations = max(self.MIN_ITERATIONS, min(iterations, affordable))
+        iterations = max(2, iterations // deal_multiple) * deal_multiple
+        # Worst-case (p = 0.5) half-width, reduced by the variance reduction of the scheme
+        expected_error = CONFIDENCE_Z * 50 / math.sqrt(iterations * variance_factor)
+        return PlanEstimate(strategy, fixed_ms + iterations * ms_per_deal, expected_error, iterations)
+
+    @staticmethod
+    def choose(estimates: List[PlanEstimate], max_latency_ms: Optional[float] = None) -> PlanEstimate:
+        """Most accurate estimate within the budget, or the fastest one if none fits"""
+        fitting = [
+            estimate for estimate in estimates
+            if max_latency_ms is None or estimate.estimated_ms <= max_latency_ms
+        ]
+        if not fitting:
+            return min(estimates, key=lambda estimate: estimate.estimated_ms)
+        return min(fitting, key=lambda estimate: (estimate.expected_error, estimate.estimated_ms))
@@ -0,0 +1,34 @@
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """Raised by the engine when the caller cancelled a running calculation"""
+
+    def __init__(self, progress: float = 0.0):
+        super().__init__("Analysis cancelled")
+        # Fraction of the calculation done before it stopped (0 = none, 1 = all)
+        self.progress = min(max(progress, 0.0), 1.0)
+
+
+class CancellationToken:
+    """
+    Cancellation flag shared between a request handler and the engine
+    thread working for it. The handler calls cancel(); the engine calls
+    check() between simulation chunks, which raises AnalysisCancelled once
+    cancelled. Safe to use from any thread.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self, progress: float = 0.0):
+        """Raise AnalysisCancelled (reporting `progress`) if cancelled"""
+        if self._event.is_set():
+            raise AnalysisCancelled(progress)
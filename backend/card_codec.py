@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from treys import Card as TreysCard
+
+from hand_evaluator import TREYS_CARDS
+
+# Request spellings of ranks and suits, in card id order (id = rank * 4 + suit,
+# see hand_evaluator)
+REQUEST_RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+REQUEST_SUITS = ('spades', 'hearts', 'diamonds', 'clubs')
+RANK_ALIASES = {'T': '10'}  # accepted from engine callers, not from API requests
+
+# Card id of every (rank, suit) pair a request may contain
+CARD_IDS: Dict[Tuple[str, str], int] = {
+    (rank, suit): rank_index * 4 + suit_index
+    for rank_index, rank in enumerate(REQUEST_RANKS)
+    for suit_index, suit in enumerate(REQUEST_SUITS)
+}
+
+DECK = np.arange(52, dtype=np.int64)
+DECK_BITS = np.uint64(1) << DECK.astype(np.uint64)
+
+
+def card_id(rank: str, suit: str) -> Optional[int]:
+    """Card id of a request rank and suit, or None if either is unknown"""
+    return CARD_IDS.get((RANK_ALIASES.get(rank, rank), suit))
+
+
+def encode_card(card) -> int:
+    """Card id of any card with rank and suit attributes; raises ValueError if unknown"""
+    encoded = card_id(card.rank, card.suit)
+    if encoded is None:
+        raise ValueError(f"Invalid card: {card.rank} of {card.suit}")
+    return encoded
+
+
+def encode_cards(cards: Iterable) -> List[int]:
+    """Card ids of a card list, skipping empty (None) slots"""
+    return [encode_card(card) for card in cards if card]
+
+
+def card_label(card_id: int) -> str:
+    """Display form of a card id, such as '[A♥]'"""
+    return TreysCard.int_to_pretty_str(TREYS_CARDS[card_id])
+
+
+def cards_mask(card_ids: Iterable[int]) -> np.uint64:
+    """64-bit mask with one bit per card id"""
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << int(card_id)
+    return np.uint64(mask)
+
+
+def check_distinct_cards(card_ids: Iterable[int]):
+    """Raise ValueError if a card appears twice"""
+    mask = 0
+    for card_id in card_ids:
+        bit = 1 << int(card_id)
+        if mask & bit:
+            raise ValueError("Duplicate cards detected")
+        mask |= bit
+
+
+def remaining_cards(dead_mask: np.uint64) -> np.ndarray:
+    """Card ids (ascending) of the deck without the cards in dead_mask"""
+    return DECK[(DECK_BITS & np.uint64(dead_mask)) == 0]
@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Type
+
+import numpy as np
+
+
+def draw_uniform(
+    remaining_deck: np.ndarray,
+    row_masks: np.ndarray,
+    count: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw count cards per row uniformly from remaining_deck without the
+    cards of row_masks, redrawing collisions; row_masks is updated in place
+    """
+    cards = np.empty((len(row_masks), count), dtype=np.int64)
+    for position in range(count):
+        drawn = remaining_deck[rng.integers(0, len(remaining_deck), size=len(row_masks))]
+        pending = np.flatnonzero((np.uint64(1) << drawn.astype(np.uint64)) & row_masks)
+        while len(pending):
+            redrawn = remaining_deck[rng.integers(0, len(remaining_deck), size=len(pending))]
+            drawn[pending] = redrawn
+            pending = pending[((np.uint64(1) << redrawn.astype(np.uint64)) & row_masks[pending]) != 0]
+        cards[:, position] = drawn
+        row_masks |= np.uint64(1) << drawn.astype(np.uint64)
+    return cards
+
+
+class DeckSampler(ABC):
+    """
+    Deals cards without replacement to a batch of deals (rows).
+
+    reset() starts a new batch, then each deal(rows, count) returns the next
+    count cards of every listed row. All rows of a batch share one deal
+    position, so rows left out of a call (deals already decided) simply
+    never receive those cards. Buffers are allocated once for batches of up
+    to max_batch_size rows. remaining_deck is one deck shared by every row,
+    or a (batch, n) array of per-row decks.
+    """
+
+    name = ""
+
+    def __init__(self, remaining_deck: np.ndarray, max_batch_size: int):
+        self.remaining_deck = remaining_deck
+        self.deck_size = remaining_deck.shape[-1]
+        self.position = 0
+
+    def reset(self, batch_size: int, rng: np.random.Generator):
+        self.rng = rng
+        self.position = 0
+
+    @abstractmethod
+    def deal(self, rows: np.ndarray, count: int) -> np.ndarray:
+        """Next count cards of every row in rows, as a (len(rows), count) array"""
+
+
+class FisherYatesSampler(DeckSampler):
+    """Partial Fisher-Yates shuffle: one swap per dealt card, nothing else is permuted"""
+
+    name = "fisher_yates"
+
+    def __init__(self, remaining_deck: np.ndarray, max_batch_size: int):
+        super().__init__(remaining_deck, max_batch_size)
+        self.decks = np.empty((max_batch_size, self.deck_size), dtype=np.int64)
+
+    def reset(self, batch_size: int, rng: np.random.Generator):
+        super().reset(batch_size, rng)
+        self.decks[:batch_size] = self.remaining_deck
+
+    def deal(self, rows: np.ndarray, count: int) -> np.ndarray:
+        decks = self.decks
+        for position in range(self.position, self.position + count):
+            picks = self.rng.integers(position, self.deck_size, size=len(rows))
+            picked = decks[rows, picks]
+            decks[rows, picks] = decks[rows, position]
+            decks[rows, position] = picked
+        dealt = decks[rows, self.position:self.position + count]
+        self.position += count
+        return dealt
+
+
+class PermutationSampler(DeckSampler):
+    """Full per-row permutation of the deck with Generator.permuted, dealt from the front"""
+
+    name = "permutation"
+
+    def __init__(self, remaining_deck: np.ndarray, max_batch_size: int):
+        super().__init__(remaining_deck, max_batch_size)
+        self.decks = np.empty((max_batch_size, self.deck_size), dtype=np.int64)
+
+    def reset(self, batch_size: int, rng: np.random.Generator):
+        super().reset(batch_size, rng)
+        decks = self.decks[:batch_size]
+        decks[:] = self.remaining_deck
+        rng.permuted(decks, axis=1, out=decks)
+
+    def deal(self, rows: np.ndarray, count: int) -> np.ndarray:
+        dealt = self.decks[rows, self.position:self.position + count]
+        self.position += count
+        return dealt
+
+
+class BitmaskSampler(DeckSampler):
+    """Uniform picks from the whole deck, rejected against a 64-bit mask of each row's dealt cards"""
+
+    name = "bitmask"
+
+    def __init__(self, remaining_deck: np.ndarray, max_batch_size: int):
+        if remaining_deck.ndim != 1:
+            raise ValueError("The bitmask sampler needs one deck shared by every row")
+        super().__init__(remaining_deck, max_batch_size)
+        self.masks = np.zeros(max_batch_size, dtype=np.uint64)
+
+    def reset(self, batch_size: int, rng: np.random.Generator):
+        super().reset(batch_size, rng)
+        self.masks[:batch_size] = 0
+
+    def deal(self, rows: np.ndarray, count: int) -> np.ndarray:
+        row_masks = self.masks[rows]
+        dealt = draw_uniform(self.remaining_deck, row_masks, count, self.rng)
+        self.masks[rows] = row_masks
+        self.position += count
+        return dealt
+
+
+DECK_SAMPLERS: Dict[str, Type[DeckSampler]] = {
+    sampler.name: sampler for sampler in (FisherYatesSampler, PermutationSampler, BitmaskSampler)
+}
+
+# Fastest backend in benchmark_engine.py --samplers on every street and table size
+DEFAULT_DECK_SAMPLER = BitmaskSampler.name
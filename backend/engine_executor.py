@@ -0,0 +1,135 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from cancellation import AnalysisCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class EngineBusyError(Exception):
+    """Raised when the engine admission queue is full"""
+
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("Poker engine is at capacity")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class EngineSlot:
+    """
+    Admission slot taken ahead of an engine call (see EngineExecutor.reserve).
+
+    start() hands the slot to the engine call, which releases it when it
+    finishes; release() gives back a slot that was never started and does
+    nothing afterwards, so it can sit in a finally block.
+    """
+
+    def __init__(self, executor: "EngineExecutor"):
+        self._executor = executor
+        self._held = True
+
+    def start(self, func: Callable, *args, **kwargs) -> "asyncio.Future":
+        """Submit func(*args, **kwargs) on the engine pool; await the returned future for its result"""
+        if not self._held:
+            raise RuntimeError("Engine slot already used or released")
+        future = self._executor._executor.submit(functools.partial(func, *args, **kwargs))
+        self._held = False
+        future.add_done_callback(self._executor._release)
+        return asyncio.wrap_future(future)
+
+    def release(self):
+        if self._held:
+            self._held = False
+            self._executor._release_unused()
+
+
+class EngineExecutor:
+    """
+    Runs CPU-bound engine calls on a dedicated thread pool so they never
+    block the asyncio event loop, behind a bounded admission queue.
+
+    At most max_workers calls run at once and at most max_queue more wait for
+    a thread; anything beyond that is rejected immediately with
+    EngineBusyError instead of letting latency grow without limit. A slot is
+    only released when the engine call has really finished, even if the
+    awaiting request was cancelled in the meantime; engine calls given a
+    cancellation token stop at their next chunk, which frees the slot
+    quickly. Calls ending in AnalysisCancelled are counted apart, together
+    with the share of their work that was never done.
+
+    Handlers that must do paid work first (charging usage) reserve() a slot
+    before it, so the engine call can no longer be rejected afterwards.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, retry_after_seconds: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="poker-engine")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        # Sum over cancelled calls of the fraction of their work skipped
+        self.cancelled_work_saved = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def check_capacity(self):
+        """Fail fast (before any other work is done for a request) when saturated"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise EngineBusyError(self.retry_after_seconds)
+
+    def reserve(self) -> EngineSlot:
+        """Take a slot for a later engine call, or raise EngineBusyError when saturated"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise EngineBusyError(self.retry_after_seconds)
+            self._in_flight += 1
+        return EngineSlot(self)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the engine pool and await its result"""
+        slot = self.reserve()
+        try:
+            future = slot.start(func, *args, **kwargs)
+        finally:
+            slot.release()
+        return await future
+
+    def _release_unused(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _release(self, future):
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._in_flight -= 1
+            if isinstance(error, AnalysisCancelled):
+                self.cancelled += 1
+                self.cancelled_work_saved += 1.0 - error.progress
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "capacity": self.capacity,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "cancelled_work_saved": round(self.cancelled_work_saved, 2)
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
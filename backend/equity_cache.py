@@ -0,0 +1,127 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class CachedEquity:
+    """Probabilities and calculation details of a finished analysis"""
+    probabilities: Dict[str, float]
+    method: str
+    confidence: str
+    simulation_time_ms: int
+    iterations: Optional[int]  # None for exact results, which serve any precision
+    half_width: float = 0.0  # 95% half-width on win %, 0 for exact results
+    win_interval: Optional[List[float]] = None
+    seed: Optional[int] = None  # RNG seed of sampled results
+
+    def serves(self, iterations: Optional[int], target_precision: Optional[float] = None) -> bool:
+        """
+        Whether this result is at least as precise as a request for
+        `iterations` (None = exact) or for a win % half-width of `target_precision`
+        """
+        if self.iterations is None:
+            return True
+        if iterations is None:
+            return False
+        if target_precision is not None and self.half_width <= target_precision:
+            return True
+        return self.iterations >= iterations
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by the entry"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.probabilities)
+            + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in self.probabilities.items())
+            + sys.getsizeof(self.method)
+            + sys.getsizeof(self.confidence)
+            + (sys.getsizeof(self.win_interval) + 2 * sys.getsizeof(0.0) if self.win_interval else 0)
+            + sys.getsizeof(self.seed)
+        )
+
+
+class EquityCache:
+    """
+    Bounded, size-aware LRU cache of equity results keyed on canonical spot
+    keys (see spot_canonicalizer). A result computed with N iterations also
+    serves any request asking for N or fewer; exact results serve everything.
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, CachedEquity]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(
+        self,
+        key: int,
+        iterations: Optional[int],
+        target_precision: Optional[float] = None
+    ) -> Optional[CachedEquity]:
+        """Cached result for a spot if it is precise enough, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.serves(iterations, target_precision):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key: int) -> Optional[CachedEquity]:
+        """Cached result for a spot whatever its precision, leaving LRU order and stats alone"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: int, entry: CachedEquity):
+        """Store a result unless a more precise one is already cached"""
+        size = entry.size_bytes()
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                if existing.serves(entry.iterations):
+                    self._entries.move_to_end(key)
+                    return
+                self.current_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self.current_bytes -= self._sizes.pop(evicted_key)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Script to (re)generate the precomputed preflop equity table loaded by PokerEngine
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from poker_engine import PokerEngine
+from preflop_table import (
+    HAND_CLASS_COUNT, MAX_PLAYERS, MIN_PLAYERS, PREFLOP_TABLE_PATH,
+    PreflopEquityTable, hand_class_name, representative_hand
+)
+
+def generate_table(trials: int, seed: int) -> PreflopEquityTable:
+    """Simulate every (hand class, player count) pair"""
+    engine = PokerEngine()
+    rng = np.random.default_rng(seed)
+    probabilities = np.zeros((HAND_CLASS_COUNT, MAX_PLAYERS - MIN_PLAYERS + 1, 2))
+
+    for index in range(HAND_CLASS_COUNT):
+        start_time = time.time()
+        hole_cards = list(representative_hand(index))
+        for player_count in range(MIN_PLAYERS, MAX_PLAYERS + 1):
+            wins, ties, total = engine._simulate_counts(hole_cards, [], player_count, trials, rng)
+            probabilities[index, player_count - MIN_PLAYERS] = (wins / total, ties / total)
+        print(f"✅ {hand_class_name(index):>4} ({index + 1}/{HAND_CLASS_COUNT}) in {time.time() - start_time:.1f}s")
+
+    return PreflopEquityTable(probabilities, trials)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=2000000, help="Simulated deals per entry")
+    parser.add_argument("--seed", type=int, default=20241017, help="RNG seed for reproducible tables")
+    parser.add_argument("--output", default=str(PREFLOP_TABLE_PATH), help="Output file")
+    args = parser.parse_args()
+
+    table = generate_table(args.trials, args.seed)
+    table.save(args.output)
+    print(f"💾 Preflop table written to {args.output}")
@@ -0,0 +1,291 @@
+import itertools
+from typing import Dict, List, Sequence
+
+import numpy as np
+from treys import Card as TreysCard
+from treys.lookup import LookupTable
+
+# Per-rank keys whose sums are unique for every 7-card rank multiset
+# (each rank used at most 4 times), so a rank histogram can be looked up
+# by simply adding up one key per card.
+RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+MAX_RANK_KEY = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11]
+
+# Card ids used by the array-based code paths: id = rank * 4 + suit,
+# rank 0..12 for 2..A and suit 0..3 for spades, hearts, diamonds, clubs
+TREYS_CARDS = [
+    TreysCard.new(TreysCard.STR_RANKS[card_id // 4] + "shdc"[card_id % 4])
+    for card_id in range(52)
+]
+TREYS_TO_ID: Dict[int, int] = {card: card_id for card_id, card in enumerate(TREYS_CARDS)}
+
+# The 1326 two-card combos as sorted card id pairs, and the combo index of
+# every pair of distinct card ids (in either order)
+COMBO_COUNT = 1326
+COMBO_CARDS = np.array(
+    [(first, second) for first in range(52) for second in range(first + 1, 52)], dtype=np.int64
+)
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.int64)
+COMBO_INDEX[COMBO_CARDS[:, 0], COMBO_CARDS[:, 1]] = np.arange(COMBO_COUNT)
+COMBO_INDEX[COMBO_CARDS[:, 1], COMBO_CARDS[:, 0]] = np.arange(COMBO_COUNT)
+# 64-bit card mask of every combo
+COMBO_MASKS = (np.uint64(1) << COMBO_CARDS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBO_CARDS[:, 1].astype(np.uint64))
+
+# Score given to hole cards sharing a card with the board: worse than any real hand
+DEAD_SCORE = LookupTable.MAX_HIGH_CARD + 1
+
+
+class LookupEvaluator:
+    """
+    Table-driven 7-card evaluator producing exactly the treys hand ranks
+    (1 = royal flush ... 7462 = seven high). It is a drop-in replacement for
+    treys.Evaluator on 7-card hands (evaluate / get_rank_class /
+    class_to_string) and is also vectorized over NumPy arrays of card ids.
+
+    Every card contributes three additive components:
+      * a rank key (sum indexes the non-flush table),
+      * a suit counter packed in 4-bit nibbles (sum tells whether a flush exists),
+      * its rank bit shifted into a 16-bit lane per suit (sum gives the flush ranks).
+    With 7 cards a flush can never coexist with quads or a full house, so the
+    flush table alone decides any hand holding five cards of one suit.
+    """
+
+    def __init__(self):
+        table = LookupTable()
+
+        card_ids = np.arange(52)
+        ranks = card_ids // 4
+        suits = card_ids % 4
+        self.rank_key = np.array(RANK_KEYS, dtype=np.int32)[ranks]
+        self.suit_count = (1 << (4 * suits)).astype(np.int32)
+        self.suit_rank_bits = (np.int64(1) << ranks.astype(np.int64)) << (16 * suits).astype(np.int64)
+
+        self.noflush_table = self._build_noflush_table(table.unsuited_lookup)
+        self.flush_table = self._build_flush_table(table.flush_lookup)
+
+        # Suit of the flush (or -1) for every packed suit-count sum
+        counts = np.arange(1 << 16)
+        self.flush_suit = np.full(1 << 16, -1, dtype=np.int8)
+        for suit in range(4):
+            has_flush = ((counts >> (4 * suit)) & 0xF) >= 5
+            self.flush_suit[has_flush] = suit
+
+        # Components of every two-card combo, so adding hole cards to a board is one lookup
+        self.combo_components = [
+            component[COMBO_CARDS].sum(axis=1)
+            for component in (self.rank_key, self.suit_count, self.suit_rank_bits)
+        ]
+
+        # Hand class boundaries, identical to treys get_rank_class
+        self.class_bounds = np.array(sorted(LookupTable.MAX_TO_RANK_CLASS), dtype=np.int16)
+        self.class_ids = np.array(
+            [LookupTable.MAX_TO_RANK_CLASS[bound] for bound in sorted(LookupTable.MAX_TO_RANK_CLASS)],
+            dtype=np.int8
+        )
+
+        # Plain-list copies for the scalar path, where NumPy indexing overhead dominates
+        self._rank_key_list = self.rank_key.tolist()
+        self._suit_count_list = self.suit_count.tolist()
+        self._suit_rank_bits_list = self.suit_rank_bits.tolist()
+        self._flush_suit_list = self.flush_suit.tolist()
+        self._flush_list = self.flush_table.tolist()
+
+    def _build_noflush_table(self, unsuited_lookup: Dict[int, int]) -> np.ndarray:
+        """Best non-flush rank for every 7-card rank multiset, indexed by rank key sum"""
+        multisets = np.array([
+            combo for combo in itertools.combinations_with_replacement(range(13), 7)
+            if max(combo.count(rank) for rank in set(combo)) <= 4
+        ])
+        primes = np.array(TreysCard.PRIMES, dtype=np.int64)[multisets]
+        subsets = np.array(list(itertools.combinations(range(7), 5)))
+        products = primes[:, subsets].prod(axis=2)
+
+        lookup_keys = np.array(sorted(unsuited_lookup), dtype=np.int64)
+        lookup_values = np.array([unsuited_lookup[key] for key in lookup_keys], dtype=np.int16)
+        scores = lookup_values[np.searchsorted(lookup_keys, products)].min(axis=1)
+
+        noflush = np.zeros(MAX_RANK_KEY + 1, dtype=np.int16)
+        noflush[np.array(RANK_KEYS, dtype=np.int32)[multisets].sum(axis=1)] = scores
+        # Sum 0 would be seven deuces: it is free to mark dead hands (see BoardState.score_combos)
+        noflush[0] = DEAD_SCORE
+        return noflush
+
+    def _build_flush_table(self, flush_lookup: Dict[int, int]) -> np.ndarray:
+        """Best flush rank for every 13-bit suited rank mask holding 5 to 7 cards"""
+        flush = np.zeros(1 << 13, dtype=np.int16)
+        for mask in range(1 << 13):
+            suited_ranks = [rank for rank in range(13) if mask >> rank & 1]
+            if not 5 <= len(suited_ranks) <= 7:
+                continue
+            flush[mask] = min(
+                flush_lookup[int(np.prod([TreysCard.PRIMES[rank] for rank in combo]))]
+                for combo in itertools.combinations(suited_ranks, 5)
+            )
+        return flush
+
+    def evaluate(self, board: Sequence[int], hand: Sequence[int]) -> int:
+        """
+        Rank a 7-card hand given as treys card integers. Lower is better,
+        exactly as returned by treys.Evaluator.evaluate.
+        """
+        card_ids = [TREYS_TO_ID[card] for card in itertools.chain(board, hand)]
+        if len(card_ids) != 7:
+            raise ValueError("LookupEvaluator only evaluates 7-card hands")
+        return self.evaluate_ids(card_ids)
+
+    def evaluate_ids(self, card_ids: Sequence[int]) -> int:
+        """Rank a single 7-card hand given as card ids"""
+        flush_suit = self._flush_suit_list[sum([self._suit_count_list[card] for card in card_ids])]
+        if flush_suit >= 0:
+            suited_bits = sum([self._suit_rank_bits_list[card] for card in card_ids]) >> (16 * flush_suit)
+            return self._flush_list[suited_bits & 0x1FFF]
+        return int(self.noflush_table[sum([self._rank_key_list[card] for card in card_ids])])
+
+    def get_rank_class(self, hand_rank: int) -> int:
+        """Class of a hand rank (0 = royal flush ... 9 = high card), as in treys"""
+        if not 1 <= hand_rank <= LookupTable.MAX_HIGH_CARD:
+            raise ValueError(f"Invalid hand rank: {hand_rank}")
+        return int(self.class_ids[np.searchsorted(self.class_bounds, hand_rank)])
+
+    def rank_classes(self, hand_ranks: np.ndarray) -> np.ndarray:
+        """Vectorized get_rank_class"""
+        return self.class_ids[np.searchsorted(self.class_bounds, hand_ranks)]
+
+    def class_to_string(self, class_int: int) -> str:
+        """Human-readable name of a hand class"""
+        return LookupTable.RANK_CLASS_TO_STRING[class_int]
+
+    def score_sums(
+        self,
+        rank_sums: np.ndarray,
+        suit_sums: np.ndarray,
+        bit_sums: np.ndarray
+    ) -> np.ndarray:
+        """Turn summed card components (any matching shapes) into treys hand ranks"""
+        scores = self.noflush_table[rank_sums]
+        flush_suits = self.flush_suit[suit_sums]
+        flushed = flush_suits >= 0
+        if flushed.any():
+            suited_bits = (bit_sums[flushed] >> (16 * flush_suits[flushed].astype(np.int64))) & 0x1FFF
+            scores[flushed] = self.flush_table[suited_bits]
+        return scores
+
+    def components(self, cards: np.ndarray) -> List[np.ndarray]:
+        """Summed rank/suit/bit components over the last axis of an array of card ids"""
+        return [
+            self.rank_key[cards].sum(axis=-1),
+            self.suit_count[cards].sum(axis=-1),
+            self.suit_rank_bits[cards].sum(axis=-1)
+        ]
+
+    def evaluate_batch(self, cards: np.ndarray) -> np.ndarray:
+        """Evaluate an (N, 7) array of card ids"""
+        return self.score_sums(*self.components(cards))
+
+    def board_state(self, board: np.ndarray) -> "BoardState":
+        """State of a board prefix (or of an array of prefixes along the last axis)"""
+        return BoardState(self, self.components(board), card_masks(board))
+
+
+class BoardState:
+    """
+    Summed components of one board prefix or of an array of them. The board
+    is hashed once: adding runout cards is an addition and scoring hole
+    cards adds the precomputed components of their combo before the table
+    lookups, so several players and runouts share the prefix work. masks
+    holds the card mask of every board.
+    """
+
+    def __init__(self, evaluator: LookupEvaluator, components: List[np.ndarray], masks: np.ndarray):
+        self.evaluator = evaluator
+        self.components = components
+        self.masks = masks
+
+    def extend(self, cards: np.ndarray) -> "BoardState":
+        """Prefix plus cards (..., k), one row of cards per board of this state"""
+        return BoardState(self.evaluator, [
+            board_part + card_part
+            for board_part, card_part in zip(self.components, self.evaluator.components(cards))
+        ], self.masks | card_masks(cards))
+
+    def select(self, rows: np.ndarray) -> "BoardState":
+        """State of a subset of the boards (indexes along the first axis)"""
+        return BoardState(
+            self.evaluator, [board_part[rows] for board_part in self.components], self.masks[rows]
+        )
+
+    def score_combos(self, combos: np.ndarray) -> np.ndarray:
+        """
+        Hand ranks of combo indexes on complete boards. combos gets one more
+        trailing axis than the boards (several hands per board) and is
+        broadcast against them, so one row of combos serves every board.
+        Combos sharing a card with their board score DEAD_SCORE: they are
+        not real hands, and their summed rank keys fall outside the table.
+        """
+        live = (COMBO_MASKS[combos] & np.asarray(self.masks)[..., None]) == 0
+        rank_sums, suit_sums, bit_sums = [
+            np.asarray(board_part)[..., None] + combo_part[combos]
+            for board_part, combo_part in zip(self.components, self.evaluator.combo_components)
+        ]
+        # Zeroed sums of dead combos read no flush and the DEAD_SCORE table entry
+        rank_sums *= live
+        suit_sums *= live
+        return self.evaluator.score_sums(rank_sums, suit_sums, bit_sums)
+
+    def combo_table(self) -> np.ndarray:
+        """
+        Hand ranks of all 1326 combos on each complete board (last axis),
+        DEAD_SCORE for combos sharing a card with the board
+        """
+        return self.score_combos(np.arange(COMBO_COUNT))
+
+
+class BoardTables:
+    """
+    Score tables of every board completing a known prefix with at most two
+    more cards, built lazily and memoized for the length of one simulation.
+    Once the table of a board exists, scoring any number of players on it
+    is a single lookup per player.
+    """
+
+    def __init__(self, evaluator: LookupEvaluator, prefix: np.ndarray, cards_needed: int):
+        if cards_needed > 2:
+            raise ValueError("Board tables need at most two cards to come")
+        self.prefix = evaluator.board_state(prefix)
+        self.cards_needed = cards_needed
+        board_keys = (1, 52, COMBO_COUNT)[cards_needed]
+        self.tables = np.zeros((board_keys, COMBO_COUNT), dtype=np.int16)
+        self.built = np.zeros(board_keys, dtype=bool)
+
+    @staticmethod
+    def board_count(remaining_cards: int, cards_needed: int) -> int:
+        """Number of distinct boards (hence of tables) a simulation can reach"""
+        return [1, remaining_cards, remaining_cards * (remaining_cards - 1) // 2][cards_needed]
+
+    def _keys(self, runouts: np.ndarray) -> np.ndarray:
+        if self.cards_needed == 0:
+            return np.zeros(len(runouts), dtype=np.int64)
+        if self.cards_needed == 1:
+            return runouts[:, 0]
+        return COMBO_INDEX[runouts[:, 0], runouts[:, 1]]
+
+    def scores(self, runouts: np.ndarray, combos: np.ndarray) -> np.ndarray:
+        """Hand ranks of combos (deals x hands) on the boards completed by runouts (deals x cards)"""
+        keys = self._keys(runouts)
+        missing = np.unique(keys[~self.built[keys]])
+        if len(missing):
+            if self.cards_needed == 0:
+                cards = np.zeros((1, 0), dtype=np.int64)
+            elif self.cards_needed == 1:
+                cards = missing[:, None]
+            else:
+                cards = COMBO_CARDS[missing]
+            self.tables[missing] = self.prefix.extend(cards).combo_table()
+            self.built[missing] = True
+        return self.tables[keys[:, None], combos]
+
+
+def card_masks(cards: np.ndarray) -> np.ndarray:
+    """64-bit card mask of each row of card ids (last axis)"""
+    cards = np.asarray(cards, dtype=np.int64)
+    return np.bitwise_or.reduce(np.uint64(1) << cards.astype(np.uint64), axis=-1)
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from hand_evaluator import COMBO_CARDS, COMBO_COUNT, COMBO_MASKS
+from preflop_table import HAND_CLASS_COUNT, PreflopEquityTable, hand_class_index
+
+# Weight vectors follow the combo order of hand_evaluator.COMBO_CARDS
+COMBO_CLASSES = np.array([hand_class_index(combo) for combo in COMBO_CARDS.tolist()], dtype=np.int64)
+
+# Name of the opponent slot that is dealt uniformly random cards
+RANDOM_PROFILE = "Random"
+
+
+@dataclass
+class HandRange:
+    """Weighted combo set: one weight in [0, 1] per entry of COMBO_CARDS"""
+    name: str
+    weights: np.ndarray
+
+    @property
+    def bitmask(self) -> np.ndarray:
+        """Packed membership bits, one per combo (166 bytes)"""
+        return np.packbits(self.weights > 0)
+
+    @property
+    def combo_count(self) -> float:
+        """Weighted number of combos"""
+        return float(self.weights.sum())
+
+    def available(self, dead_mask: np.uint64) -> np.ndarray:
+        """Weights with every combo holding a dead card zeroed (card removal)"""
+        return np.where(COMBO_MASKS & dead_mask, 0.0, self.weights)
+
+    def check_available(self, dead_mask: np.uint64) -> np.ndarray:
+        """available(), raising ValueError when card removal leaves no combo"""
+        weights = self.available(dead_mask)
+        if not weights.any():
+            raise ValueError(f"Range {self.name} has no combos left with the known cards")
+        return weights
+
+    def sampler(self, dead_mask: np.uint64) -> "RangeSampler":
+        return RangeSampler(self.check_available(dead_mask))
+
+
+class RangeSampler:
+    """
+    Draws combos from a weighted range for a whole batch of deals at once.
+
+    Draws use Walker's alias method (one uniform column plus one coin flip per
+    row, O(1) whatever the weights), then rows whose draw collides with cards
+    already dealt in that row are redrawn; the few rows still colliding after
+    MAX_REJECTION_ROUNDS are sampled exactly from their own row-masked
+    weights. Each opponent is therefore drawn from its range conditioned on
+    the cards dealt before it.
+    """
+
+    MAX_REJECTION_ROUNDS = 8
+
+    def __init__(self, weights: np.ndarray):
+        self.weights = weights
+        self.combos = np.flatnonzero(weights)
+        self.accept, self.alias = self._alias_table(weights[self.combos])
+
+    @staticmethod
+    def _alias_table(weights: np.ndarray):
+        """Vose's construction of the acceptance and alias columns"""
+        count = len(weights)
+        scaled = weights * count / weights.sum()
+        accept = np.ones(count)
+        alias = np.arange(count)
+        small = [index for index in range(count) if scaled[index] < 1.0]
+        large = [index for index in range(count) if scaled[index] >= 1.0]
+        while small and large:
+            low, high = small.pop(), large[-1]
+            accept[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            if scaled[high] < 1.0:
+                small.append(large.pop())
+        return accept, alias
+
+    def _draw(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        columns = rng.integers(0, len(self.combos), size=size)
+        columns = np.where(rng.random(size) < self.accept[columns], columns, self.alias[columns])
+        return self.combos[columns]
+
+    def sample(self, row_masks: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Combo indexes (one per row) avoiding the cards in row_masks"""
+        combos = self._draw(len(row_masks), rng)
+        pending = np.flatnonzero(COMBO_MASKS[combos] & row_masks)
+        for _ in range(self.MAX_REJECTION_ROUNDS):
+            if not len(pending):
+                return combos
+            redrawn = self._draw(len(pending), rng)
+            combos[pending] = redrawn
+            pending = pending[(COMBO_MASKS[redrawn] & row_masks[pending]) != 0]
+
+        if len(pending):
+            row_weights = np.where(
+                (COMBO_MASKS[None, :] & row_masks[pending, None]) != 0, 0.0, self.weights[None, :]
+            )
+            row_cumulative = np.cumsum(row_weights, axis=1)
+            if not (row_cumulative[:, -1] > 0).all():
+                raise ValueError("Opponent ranges cannot all be dealt at the same time")
+            targets = rng.random(len(pending)) * row_cumulative[:, -1]
+            combos[pending] = (row_cumulative <= targets[:, None]).sum(axis=1)
+        return combos
+
+
+@dataclass(frozen=True)
+class OpponentProfile:
+    """
+    Player type shown with every analysis. The range holds the strongest
+    core_fraction of all combos at full weight, then weights fade linearly
+    to zero at outer_fraction.
+    """
+    name: str
+    range_label: str
+    likely_holdings: List[str]
+    core_fraction: float
+    outer_fraction: float
+
+
+OPPONENT_PROFILES = [
+    OpponentProfile("Tight-Aggressive", "15-20% of hands", ["High pairs (99+)", "Strong aces (AQ+)", "Suited connectors (JT+)"], 0.15, 0.20),
+    OpponentProfile("Loose-Aggressive", "25-35% of hands", ["Medium pairs (66+)", "Suited cards", "Broadway cards"], 0.25, 0.35),
+    OpponentProfile("Tight-Passive", "10-15% of hands", ["Premium pairs (JJ+)", "Strong aces (AK, AQ)"], 0.10, 0.15),
+    OpponentProfile("Loose-Passive", "30-45% of hands", ["Any pair", "Suited cards", "Face cards", "Connecting cards"], 0.30, 0.45)
+]
+
+
+def compile_profile_ranges(preflop_table: Optional[PreflopEquityTable]) -> Dict[str, HandRange]:
+    """
+    Combo-weight arrays of the opponent profiles. Starting hands are ordered
+    by heads-up equity against a random hand (win + tie / 2, from the
+    preflop table); without a table no profile range is available.
+    """
+    if preflop_table is None:
+        return {}
+
+    heads_up = preflop_table.probabilities[:, 0]
+    class_order = np.argsort(-(heads_up[:, 0] + heads_up[:, 1] / 2), kind="stable")
+    class_combos = np.bincount(COMBO_CLASSES, minlength=HAND_CLASS_COUNT)
+
+    # Fraction of all combos ranked at or above the middle of each class
+    ordered_combos = class_combos[class_order]
+    position = np.empty(HAND_CLASS_COUNT)
+    position[class_order] = (np.cumsum(ordered_combos) - ordered_combos / 2) / COMBO_COUNT
+
+    ranges = {}
+    for profile in OPPONENT_PROFILES:
+        fade = (profile.outer_fraction - position) / (profile.outer_fraction - profile.core_fraction)
+        class_weights = np.clip(fade, 0.0, 1.0)
+        ranges[profile.name] = HandRange(profile.name, class_weights[COMBO_CLASSES])
+    return ranges
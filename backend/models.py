@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 import uuid
 
@@ -12,6 +12,17 @@ class AnalysisRequest(BaseModel):
     community_cards: List[Optional[Card]] = Field(..., description="Community cards (flop, turn, river)")
     player_count: int = Field(2, ge=2, le=10, description="Number of players in the hand")
     simulation_iterations: int = Field(100000, ge=10000, le=500000, description="Monte Carlo simulation iterations")
+    method: Literal["auto", "monte_carlo", "exact", "analytic"] = Field("auto", description="Calculation method (exact enumeration is heads-up postflop only, analytic multiway equity needs 3-10 players)")
+    sampling: Literal["random", "stratified", "hybrid"] = Field("random", description="Monte Carlo sampling scheme (stratified runouts with paired opponent deals, or hybrid: every runout enumerated and opponents sampled, flop and turn)")
+    opponent_profiles: Optional[List[Literal["Tight-Aggressive", "Loose-Aggressive", "Tight-Passive", "Loose-Passive", "Random"]]] = Field(None, max_length=9, description="One profile per opponent; profiled opponents are dealt hands from their weighted range")
+    custom_ranges: Optional[List[str]] = Field(None, max_length=9, description="Premium: one range per opponent in standard notation, e.g. '22+, A2s+, KTo+, QJs'")
+    target_precision: Optional[float] = Field(None, gt=0, le=5, description="Stop simulating once the 95% half-width on win probability (%) is below this; simulation_iterations becomes an upper bound")
+    seed: Optional[int] = Field(None, ge=0, le=2**53 - 1, description="Seed of the simulation RNG; the same seed reproduces a sampled result (random when omitted)")
+    max_latency_ms: Optional[float] = Field(None, gt=0, le=60000, description="Latency budget: the most accurate method estimated to fit is chosen, with fewer simulations if needed (method auto and random sampling only)")
+    time_budget_ms: Optional[float] = Field(None, gt=0, le=60000, description="Wall-clock budget of Monte Carlo simulation: simulate until it runs out and report the precision reached; simulation_iterations becomes an upper bound (random sampling only)")
+
+class AnalysisBatchRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(..., min_length=1, max_length=200, description="Spots to analyze, results are returned in the same order")
 
 class HandStrength(BaseModel):
     name: str = Field(..., description="Name of the hand (e.g., 'Pair', 'Straight')")
@@ -34,6 +45,18 @@ class CalculationDetails(BaseModel):
     confidence: str = Field(..., description="Statistical confidence interval")
     cards_remaining: int = Field(..., description="Number of unknown cards remaining")
     simulation_time_ms: int = Field(..., description="Time taken for calculations in milliseconds")
+    cached: bool = Field(False, description="Whether the result was served from the equity cache")
+    iterations: Optional[int] = Field(None, description="Monte Carlo simulations actually run")
+    win_interval: Optional[List[float]] = Field(None, description="95% confidence interval on win probability (%)")
+    seed: Optional[int] = Field(None, description="Seed of the simulation RNG (sampled results only)")
+
+class SimulationProgress(BaseModel):
+    iterations: int = Field(..., description="Monte Carlo simulations run so far")
+    iterations_target: int = Field(..., description="Simulation budget of the request")
+    win_probability: float = Field(..., ge=0, le=100, description="Running win probability estimate (%)")
+    tie_probability: float = Field(..., ge=0, le=100, description="Running tie probability estimate (%)")
+    lose_probability: float = Field(..., ge=0, le=100, description="Running lose probability estimate (%)")
+    win_interval: List[float] = Field(..., description="Current 95% confidence interval on win probability (%)")
 
 class AnalysisResponse(BaseModel):
     win_probability: float = Field(..., ge=0, le=100, description="Probability of winning (%)")
@@ -44,9 +67,28 @@ class AnalysisResponse(BaseModel):
     recommendation: Recommendation
     calculations: CalculationDetails
 
+class HandComparisonRequest(BaseModel):
+    seats: List[Optional[List[Card]]] = Field(..., min_length=2, max_length=10, description="Two hole cards per seat, or null for a random hand")
+    community_cards: List[Optional[Card]] = Field(default_factory=list, description="Community cards (flop, turn, river)")
+    simulation_iterations: int = Field(100000, ge=10000, le=500000, description="Monte Carlo simulation iterations")
+    seed: Optional[int] = Field(None, ge=0, le=2**53 - 1, description="Seed of the simulation RNG; the same seed reproduces a sampled result (random when omitted)")
+
+class SeatEquity(BaseModel):
+    seat: int = Field(..., description="Seat index, in request order")
+    hole_cards: Optional[List[str]] = Field(None, description="Known hole cards, null for a random hand")
+    equity: float = Field(..., ge=0, le=100, description="Expected share of the pot (%), split pots counted fractionally")
+    win_probability: float = Field(..., ge=0, le=100, description="Probability of winning the whole pot (%)")
+    tie_probability: float = Field(..., ge=0, le=100, description="Probability of splitting the pot (%)")
+
+class HandComparisonResponse(BaseModel):
+    seats: List[SeatEquity]
+    calculations: CalculationDetails
+
 class HandHistory(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     analysis_request: AnalysisRequest
     analysis_response: AnalysisResponse
     timestamp: datetime = Field(default_factory=datetime.utcnow)
-    user_id: Optional[str] = None
\ No newline at end of file
+    user_id: Optional[str] = None
+    spot_key: Optional[int] = Field(None, description="Canonical spot key (suit-isomorphic spots share it)")
+    card_mask: Optional[int] = Field(None, description="Known cards (hole and community) as a 52-bit card id mask, see card_codec")
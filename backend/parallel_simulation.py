@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from cancellation import CancellationToken
+from hand_ranges import HandRange
+
+# Engine instance living in each worker process (see _init_worker)
+_worker_engine = None
+
+
+def _init_worker():
+    """Build the lookup evaluator once per worker instead of once per task"""
+    global _worker_engine
+    from poker_engine import PokerEngine
+    _worker_engine = PokerEngine()
+
+
+def _simulate_chunk(
+    hole_cards: List[int],
+    community_cards: List[int],
+    player_count: int,
+    iterations: int,
+    seed_sequence: np.random.SeedSequence,
+    opponent_ranges: Optional[List[Optional[HandRange]]] = None
+) -> Tuple[int, int, int]:
+    rng = np.random.default_rng(seed_sequence)
+    return _worker_engine._simulate_counts(
+        hole_cards, community_cards, player_count, iterations, rng, opponent_ranges=opponent_ranges
+    )
+
+
+class ParallelSimulator:
+    """
+    Splits a Monte Carlo iteration budget across a persistent process pool.
+
+    The budget is cut into CHUNKS_PER_WORKER chunks per worker, so a
+    cancelled run can drop the chunks no worker has picked up yet. Each
+    chunk gets its own child of one SeedSequence, so a seeded run gives the
+    same merged counts no matter which worker picks up which chunk.
+    """
+
+    # Interval at which a cancellable run checks its token while chunks run
+    CANCEL_POLL_SECONDS = 0.05
+    # Chunks queued per worker: more chunks let cancellation skip more work
+    CHUNKS_PER_WORKER = 8
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a server process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def simulate_counts(
+        self,
+        hole_cards: List[int],
+        community_cards: List[int],
+        player_count: int,
+        iterations: int,
+        seed: Optional[int] = None,
+        opponent_ranges: Optional[List[Optional[HandRange]]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int, int]:
+        """
+        Run `iterations` deals across the pool and merge (wins, ties, total).
+
+        With cancel_token, the wait is abandoned as soon as it is cancelled:
+        chunks not started yet are dropped, chunks already running in a
+        worker finish there and their counts are discarded. The raised
+        AnalysisCancelled reports the share of the budget that was or still
+        is being simulated, so only dropped chunks count as work saved.
+        """
+        chunk_count = self.workers * self.CHUNKS_PER_WORKER
+        chunk_sizes = [
+            iterations // chunk_count + (1 if chunk < iterations % chunk_count else 0)
+            for chunk in range(chunk_count)
+        ]
+        chunk_sizes = [size for size in chunk_sizes if size]
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+        executor = self._get_executor()
+        futures = [
+            executor.submit(
+                _simulate_chunk, hole_cards, community_cards, player_count, size, seed_sequence,
+                opponent_ranges
+            )
+            for size, seed_sequence in zip(chunk_sizes, seed_sequences)
+        ]
+
+        if cancel_token is not None:
+            pending = futures
+            while pending:
+                _, pending = wait(pending, timeout=self.CANCEL_POLL_SECONDS)
+                if cancel_token.cancelled:
+                    # Running chunks cannot be cancelled: they count as work done
+                    for future in pending:
+                        future.cancel()
+                    cancel_token.check(sum(
+                        size for size, future in zip(chunk_sizes, futures) if not future.cancelled()
+                    ) / iterations)
+
+        wins = ties = total = 0
+        for future in futures:
+            chunk_wins, chunk_ties, chunk_total = future.result()
+            wins += chunk_wins
+            ties += chunk_ties
+            total += chunk_total
+        return wins, ties, total
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
@@ -1,30 +1,31 @@
-import random
+import secrets
 import time
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+import dataclasses
 from dataclasses import dataclass
-from treys import Deck, Evaluator, Card as TreysCard
 from pydantic import BaseModel
 import itertools
+import math
+import numpy as np
+from hand_evaluator import COMBO_INDEX, BoardTables, LookupEvaluator
+from card_codec import card_label, cards_mask, check_distinct_cards, encode_cards, remaining_cards
+from deck_samplers import DECK_SAMPLERS, DEFAULT_DECK_SAMPLER, DeckSampler, FisherYatesSampler, draw_uniform
+from preflop_table import RANK_CHARS, PreflopEquityTable
+from spot_canonicalizer import canonicalize_spot
+from equity_cache import CachedEquity, EquityCache
+from calculation_planner import CalculationPlanner, PlanEstimate
+from cancellation import CancellationToken
+from parallel_simulation import ParallelSimulator
+from hand_ranges import (
+    COMBO_CARDS, COMBO_COUNT, COMBO_MASKS, OPPONENT_PROFILES, RANDOM_PROFILE, HandRange,
+    compile_profile_ranges
+)
+from range_notation import compile_range
 
 class Card(BaseModel):
     rank: str
     suit: str
 
-    def to_treys_format(self) -> int:
-        """Convert to treys library card format"""
-        rank_map = {
-            '2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8', '9': '9', 
-            '10': 'T', 'T': 'T', 'J': 'J', 'Q': 'Q', 'K': 'K', 'A': 'A'
-        }
-        suit_map = {
-            'hearts': 'h', 'diamonds': 'd', 'clubs': 'c', 'spades': 's'
-        }
-        
-        treys_rank = rank_map.get(self.rank, self.rank)
-        treys_suit = suit_map.get(self.suit, self.suit[0])
-        
-        return TreysCard.new(f"{treys_rank}{treys_suit}")
-
 @dataclass
 class HandStrength:
     name: str
@@ -50,6 +51,32 @@ class CalculationDetails:
     confidence: str
     cards_remaining: int
     simulation_time_ms: int
+    cached: bool = False
+    iterations: Optional[int] = None  # Simulations actually run (Monte Carlo only)
+    win_interval: Optional[List[float]] = None  # 95% Wilson interval on win %
+    seed: Optional[int] = None  # RNG seed of sampled results; the same seed reproduces them
+
+@dataclass
+class SimulationProgress:
+    iterations: int  # Simulations run so far
+    iterations_target: int
+    win_probability: float
+    tie_probability: float
+    lose_probability: float
+    win_interval: List[float]  # 95% Wilson interval on win %
+
+@dataclass
+class SeatEquity:
+    seat: int
+    hole_cards: Optional[List[str]]  # Known cards, None for a random hand
+    equity: float  # Expected share of the pot (%), split pots counted fractionally
+    win_probability: float  # Wins the whole pot (%)
+    tie_probability: float  # Splits the pot (%)
+
+@dataclass
+class SeatAnalysisResult:
+    seats: List[SeatEquity]
+    calculations: CalculationDetails
 
 @dataclass
 class AnalysisResult:
@@ -60,59 +87,300 @@ class AnalysisResult:
     opponent_ranges: List[OpponentRange]
     recommendation: Recommendation
     calculations: CalculationDetails
+    spot_key: int  # CanonicalSpot.key, shared with caches and hand history
 
 class PokerEngine:
-    def __init__(self):
-        self.evaluator = Evaluator()
+    # Selectable calculation methods ("auto" lets the engine pick per spot)
+    CALCULATION_METHODS = ("auto", "monte_carlo", "exact", "analytic")
+    # Number of Monte Carlo trials dealt and scored together
+    SIMULATION_BATCH_SIZE = 10000
+    # Below this many iterations process pool overhead outweighs the speedup
+    PARALLEL_MIN_ITERATIONS = 100000
+    # z-score of the reported confidence intervals (95%)
+    CONFIDENCE_Z = 1.96
+    # Minimum time between two progress reports of a running simulation
+    PROGRESS_INTERVAL_SECONDS = 0.2
+    # Monte Carlo sampling schemes ("stratified" = stratified runouts + paired deals,
+    # "hybrid" = every runout enumerated, opponents sampled per runout)
+    SAMPLING_MODES = ("random", "stratified", "hybrid")
+    # Minimum sampled boards per runout stratum in stratified sampling
+    STRATUM_MIN_BOARDS = 4
+    # Size of generated seeds: integers up to 2**53 survive JSON clients unchanged
+    SEED_BITS = 53
+    # Boards ranked together by analytic multiway equity (bounds memory)
+    ANALYTIC_BOARD_CHUNK = 256
+    # Minimum sampled boards of analytic multiway equity when runouts are not enumerated
+    ANALYTIC_MIN_BOARDS = 1000
+    # Bound on the model error of analytic multiway equity (win %), by player count.
+    # Worst bias seen against 3M-deal Monte Carlo on flop, turn and river spots
+    # (0.05-0.07 up to 5 players, 0.09 / 0.11 / 0.16 at 6 / 7 / 8, 0.27 at 9,
+    # 0.38 at 10), plus margin for spots and reference noise not covered.
+    ANALYTIC_MODEL_ERROR = {3: 0.1, 4: 0.1, 5: 0.1, 6: 0.15, 7: 0.2, 8: 0.25, 9: 0.4, 10: 0.55}
+
+    def __init__(self, parallel_workers: int = 0, deck_sampler: str = DEFAULT_DECK_SAMPLER):
+        if deck_sampler not in DECK_SAMPLERS:
+            raise ValueError(f"Unknown deck sampler: {deck_sampler}")
+        self.evaluator = LookupEvaluator()
+        self.preflop_table = PreflopEquityTable.load_default()
+        # Combo-weight ranges of the opponent profiles, by profile name
+        self.profile_ranges = compile_profile_ranges(self.preflop_table)
+        self.equity_cache = EquityCache()
+        # Large simulations are split across worker processes when enabled
+        self.parallel_simulator = ParallelSimulator(parallel_workers) if parallel_workers > 1 else None
+        # Backend dealing random cards in Monte Carlo simulations (see deck_samplers)
+        self.deck_sampler = DECK_SAMPLERS[deck_sampler]
+        # Cost model choosing the method of requests with a latency budget
+        self.planner = CalculationPlanner(self.ANALYTIC_MODEL_ERROR)
+    
+    def shutdown(self):
+        """Stop worker processes, if any"""
+        if self.parallel_simulator is not None:
+            self.parallel_simulator.shutdown()
         
     def analyze_hand(
         self, 
         hole_cards: List[Card], 
         community_cards: List[Optional[Card]], 
         player_count: int,
-        simulation_iterations: int = 100000
+        simulation_iterations: int = 100000,
+        method: str = "auto",
+        target_precision: Optional[float] = None,
+        sampling: str = "random",
+        on_progress: Optional[Callable[[SimulationProgress], None]] = None,
+        opponent_profiles: Optional[List[str]] = None,
+        custom_ranges: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+        max_latency_ms: Optional[float] = None,
+        time_budget_ms: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> AnalysisResult:
         """
         Main analysis function that determines win probabilities and strategic recommendations
+
+        method: "auto", "monte_carlo", "exact" or "analytic". Exact
+        enumeration is only available heads-up once the flop is known, and
+        analytic multiway equity (see _analytic_multiway) with 3 to 10
+        players against random hands; requesting them anywhere else raises
+        ValueError. Analytic results report the model error bound
+        ANALYTIC_MODEL_ERROR as their confidence. Under "auto", preflop spots are answered from the
+        precomputed preflop equity table when it is available.
+
+        target_precision: when set, Monte Carlo stops as soon as the 95%
+        half-width on win probability (in percentage points) is at most this
+        value; simulation_iterations is then only an upper bound.
+
+        sampling: "random", "stratified" (stratified runouts with paired
+        opponent deals, see _stratified_simulate_counts) or "hybrid" (every
+        turn/river runout enumerated once the flop is known, opponents
+        sampled per runout). Stratified and hybrid runs use the full
+        iteration budget and ignore target_precision.
+
+        on_progress: called with a SimulationProgress snapshot while a random
+        Monte Carlo simulation runs (table, exact, cached, stratified and
+        hybrid results only produce the final result).
+
+        opponent_profiles: one profile name per opponent (see
+        hand_ranges.OPPONENT_PROFILES, or "Random" for a uniformly random
+        hand). Profiled opponents are dealt holdings from their weighted
+        range; such spots are always simulated with random sampling and
+        bypass the equity cache.
+
+        custom_ranges: one range in standard notation per opponent (see
+        range_notation.compile_range), used like opponent_profiles; the two
+        cannot be combined.
+
+        seed: seed of the random number generator of sampled results; a
+        random one is drawn when omitted. Either way it is reported in the
+        calculation details, and rerunning with it (same engine settings)
+        reproduces the result. Requests with a seed skip the cache lookup.
+
+        max_latency_ms: latency budget. The planner (see
+        calculation_planner) estimates the cost and error of every method
+        available for the spot and runs the most accurate one that fits,
+        simulating fewer than simulation_iterations deals if needed (the
+        fastest one when none fits). Requires method "auto" and random
+        sampling; the decision is appended to the reported method.
+
+        time_budget_ms: wall-clock budget of a random Monte Carlo
+        simulation, counted from the start of the call. Batches are
+        simulated until another one would overrun the budget (at least one
+        batch runs), and the result reports the deals reached and their
+        confidence; simulation_iterations is then only an upper bound.
+        Table, exact and analytic results are computed in full. Requires
+        random sampling and cannot be combined with max_latency_ms.
+
+        cancel_token: checked before the calculation and between simulation
+        chunks (Monte Carlo batches, strata chunks, analytic board chunks);
+        once cancelled the call raises cancellation.AnalysisCancelled.
+        Exact enumeration and table lookups only check it before starting.
         """
         start_time = time.time()
+        if cancel_token is not None:
+            cancel_token.check()
         
-        # Convert cards to treys format
-        treys_hole = [card.to_treys_format() for card in hole_cards if card]
-        treys_community = [card.to_treys_format() for card in community_cards if card]
+        # Encode cards once: everything below works on card ids
+        hole_ids, community_ids, opponent_ranges = self._check_arguments(
+            hole_cards, community_cards, player_count, method, sampling,
+            opponent_profiles, custom_ranges, max_latency_ms, time_budget_ms
+        )
         
         # Count remaining community cards needed
-        community_cards_count = len([c for c in community_cards if c])
-        cards_remaining = 52 - len(treys_hole) - community_cards_count
+        community_cards_count = len(community_ids)
+        cards_remaining = 52 - len(hole_ids) - community_cards_count
+        
+        # Suit-isomorphic spots share one canonical representative
+        spot = canonicalize_spot(hole_ids, community_ids, player_count)
         
         # Choose calculation method based on remaining cards
-        if community_cards_count >= 4:  # Turn or river
-            probabilities = self._combinatorial_analysis(
-                treys_hole, treys_community, player_count
+        can_enumerate = self._can_enumerate(community_cards_count, player_count)
+        use_ranges = opponent_ranges is not None
+        deadline = start_time + time_budget_ms / 1000 if time_budget_ms is not None else None
+        
+        plan = None
+        cached = None
+        if max_latency_ms is not None:
+            plan, cached = self._plan(
+                spot.key, community_cards_count, player_count, simulation_iterations, max_latency_ms,
+                opponent_ranges, seed
+            )
+            if plan.strategy in ("exact", "analytic"):
+                method = plan.strategy
+            elif plan.strategy in ("monte_carlo", "hybrid"):
+                method = "monte_carlo"
+                sampling = "random" if plan.strategy == "monte_carlo" else "hybrid"
+                simulation_iterations = plan.iterations
+        # Analytic results carry a small model error, so they neither serve nor use the cache
+        use_analytic = method == "analytic"
+        use_table = method == "auto" and community_cards_count == 0 and self.preflop_table is not None and not use_ranges
+        use_exact = method == "exact" or (method == "auto" and can_enumerate and not use_ranges)
+        
+        # Reuse an earlier result for the same canonical spot if it is precise enough
+        # (planned requests already weighed the cached result against the other methods)
+        if plan is None and not use_table and not use_ranges and not use_analytic and seed is None:
+            cached = self.equity_cache.get(
+                spot.key, None if use_exact else simulation_iterations, target_precision
             )
-            method = "Combinatorial Analysis"
+        
+        iterations_used = None
+        win_interval = None
+        half_width = 0.0
+        run_seed = None
+        if cached is not None:
+            probabilities = cached.probabilities
+            calculation_method = cached.method
+            confidence = cached.confidence
+            iterations_used = cached.iterations
+            win_interval = cached.win_interval
+            run_seed = cached.seed
+        elif use_table:
+            probabilities = self.preflop_table.lookup(spot.hole_cards, player_count)
+            calculation_method = f"Preflop Table ({self.preflop_table.trials:,} simulations per hand class)"
+            confidence = self.preflop_table.confidence()
+        elif use_exact:
+            probabilities, combinations = self._combinatorial_analysis(
+                hole_ids, community_ids, player_count
+            )
+            calculation_method = f"Exact Enumeration ({combinations:,} combinations)"
+            confidence = "exact"
+        elif use_analytic:
+            sampled_seed = self._resolve_seed(seed)
+            probabilities, boards, board_half_width = self._analytic_multiway(
+                hole_ids, community_ids, player_count, simulation_iterations,
+                np.random.default_rng(sampled_seed), cancel_token
+            )
+            calculation_method = f"Analytic Multiway ({boards:,} boards)"
+            # The card-survival model is not exact: report its error bound, plus the
+            # sampling error when boards were sampled (then the seed reproduces them)
+            half_width = self.ANALYTIC_MODEL_ERROR[player_count]
+            if board_half_width is not None:
+                run_seed = sampled_seed
+                half_width += board_half_width
+            win_interval = [
+                round(max(0.0, probabilities['win'] - half_width), 2),
+                round(min(100.0, probabilities['win'] + half_width), 2)
+            ]
+            confidence = f"±{half_width:.2f}%"
+        elif sampling in ("stratified", "hybrid"):
+            run_seed = self._resolve_seed(seed)
+            wins, ties, iterations_used, half_width = self._stratified_simulate_counts(
+                hole_ids, community_ids, player_count, simulation_iterations,
+                np.random.default_rng(run_seed), enumerate_runouts=sampling == "hybrid", cancel_token=cancel_token
+            )
+            probabilities = self._to_probabilities(wins, ties, iterations_used)
+            win_interval = [
+                round(max(0.0, probabilities['win'] - half_width), 2),
+                round(min(100.0, probabilities['win'] + half_width), 2)
+            ]
+            calculation_method = f"Stratified Monte Carlo ({iterations_used:,} simulations)"
+            if sampling == "hybrid":
+                runouts = math.comb(cards_remaining, 5 - community_cards_count)
+                calculation_method = (
+                    f"Hybrid Monte Carlo ({runouts:,} runouts x {iterations_used // runouts:,} simulations)"
+                )
+            confidence = f"±{half_width:.2f}%"
         else:
-            probabilities = self._monte_carlo_simulation(
-                treys_hole, treys_community, player_count, simulation_iterations
+            run_seed = self._resolve_seed(seed)
+            wins, ties, iterations_used = self._monte_carlo_simulation(
+                hole_ids, community_ids, player_count, simulation_iterations,
+                target_precision, on_progress, opponent_ranges, run_seed, deadline, cancel_token
             )
-            method = f"Monte Carlo ({simulation_iterations:,} simulations)"
+            probabilities = self._to_probabilities(wins, ties, iterations_used)
+            low, high = self._wilson_interval(wins, iterations_used)
+            win_interval = [round(low, 2), round(high, 2)]
+            half_width = (high - low) / 2
+            simulations = f"{iterations_used:,} simulations"
+            if use_ranges:
+                simulations += " vs opponent ranges"
+            if deadline is not None:
+                simulations += f" in {time_budget_ms:,.0f} ms time budget"
+            calculation_method = f"Monte Carlo ({simulations})"
+            confidence = f"±{half_width:.2f}%"
         
         # Get current hand strength
-        current_hand = self._evaluate_current_hand(treys_hole, treys_community)
+        current_hand = self._evaluate_current_hand(hole_ids, community_ids)
         
         # Generate opponent ranges
-        opponent_ranges = self._generate_opponent_ranges(player_count)
+        opponent_range_info = self._generate_opponent_ranges(player_count, opponent_profiles, opponent_ranges)
         
         # Generate strategic recommendation
         recommendation = self._generate_recommendation(probabilities, current_hand)
         
-        calculation_time = int((time.time() - start_time) * 1000)
+        elapsed_ms = (time.time() - start_time) * 1000
+        calculation_time = int(elapsed_ms)
+        
+        if cached is None and not use_table and not use_ranges:
+            self._record_throughput(
+                use_exact, use_analytic, sampling, community_cards_count, player_count, iterations_used, elapsed_ms
+            )
+        
+        if cached is not None:
+            # Cached responses keep the cost of the original calculation
+            calculation_time = cached.simulation_time_ms
+        elif not use_table and not use_ranges and not use_analytic:
+            self.equity_cache.put(spot.key, CachedEquity(
+                probabilities=probabilities,
+                method=calculation_method,
+                confidence=confidence,
+                simulation_time_ms=calculation_time,
+                iterations=iterations_used,
+                half_width=half_width,
+                win_interval=win_interval,
+                seed=run_seed
+            ))
+        
+        # The planner decision belongs to this request, not to the cached result
+        if plan is not None:
+            calculation_method += self._plan_label(plan, max_latency_ms)
         
         calculations = CalculationDetails(
-            method=method,
-            confidence="±0.8%",
+            method=calculation_method,
+            confidence=confidence,
             cards_remaining=cards_remaining,
-            simulation_time_ms=calculation_time
+            simulation_time_ms=calculation_time,
+            cached=cached is not None,
+            iterations=iterations_used,
+            win_interval=win_interval,
+            seed=run_seed
         )
         
         return AnalysisResult(
@@ -120,9 +388,285 @@ class PokerEngine:
             tie_probability=probabilities['tie'],
             lose_probability=probabilities['lose'],
             hand_strength=current_hand,
-            opponent_ranges=opponent_ranges,
+            opponent_ranges=opponent_range_info,
             recommendation=recommendation,
-            calculations=calculations
+            calculations=calculations,
+            spot_key=spot.key
+        )
+    
+    def check_batch_item(self, item: Dict):
+        """
+        Raise the ValueError analyze_hand would raise for a batch item before
+        computing anything (cards, option combinations, opponent ranges left
+        without combos by the known cards), so callers can reject it up front
+        """
+        self._check_arguments(
+            item['hole_cards'], item['community_cards'], item['player_count'],
+            item.get('method', "auto"), item.get('sampling', "random"),
+            item.get('opponent_profiles'), item.get('custom_ranges'),
+            item.get('max_latency_ms'), item.get('time_budget_ms')
+        )
+    
+    def _check_arguments(
+        self,
+        hole_cards: List[Card],
+        community_cards: List[Optional[Card]],
+        player_count: int,
+        method: str,
+        sampling: str,
+        opponent_profiles: Optional[List[str]],
+        custom_ranges: Optional[List[str]],
+        max_latency_ms: Optional[float],
+        time_budget_ms: Optional[float]
+    ) -> Tuple[List[int], List[int], Optional[List[Optional[HandRange]]]]:
+        """
+        Validate the arguments of analyze_hand (ValueError on the first
+        problem) and return (hole card ids, community card ids, opponent ranges)
+        """
+        if method not in self.CALCULATION_METHODS:
+            raise ValueError(f"Unknown calculation method: {method}")
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {sampling}")
+        
+        hole_ids = encode_cards(hole_cards)
+        community_ids = encode_cards(community_cards)
+        check_distinct_cards(hole_ids + community_ids)
+        community_cards_count = len(community_ids)
+        
+        if method == "exact" and not self._can_enumerate(community_cards_count, player_count):
+            raise ValueError(
+                "Exact enumeration requires a heads-up spot with at least 3 community cards"
+            )
+        if method == "analytic" and not 3 <= player_count <= 10:
+            raise ValueError("Analytic multiway equity requires 3 to 10 players")
+        if method == "analytic" and sampling != "random":
+            raise ValueError("Analytic multiway equity does not sample opponents")
+        if sampling == "hybrid" and community_cards_count < 3:
+            raise ValueError("Hybrid sampling requires at least 3 community cards")
+        
+        opponent_ranges = self._resolve_opponent_ranges(opponent_profiles, player_count, custom_ranges)
+        if opponent_ranges is not None:
+            if method in ("exact", "analytic") or sampling != "random":
+                raise ValueError("Opponent profiles are only supported with random Monte Carlo sampling")
+            known_mask = cards_mask(hole_ids + community_ids)
+            for hand_range in opponent_ranges:
+                if hand_range is not None:
+                    hand_range.check_available(known_mask)
+        
+        if time_budget_ms is not None and (sampling != "random" or max_latency_ms is not None):
+            raise ValueError("A time budget requires random sampling without a latency budget")
+        if max_latency_ms is not None and (method != "auto" or sampling != "random"):
+            raise ValueError("A latency budget requires automatic method and random sampling")
+        return hole_ids, community_ids, opponent_ranges
+    
+    def analyze_seats(
+        self,
+        seats: List[Optional[List[Card]]],
+        community_cards: List[Optional[Card]],
+        simulation_iterations: int = 100000,
+        seed: Optional[int] = None
+    ) -> SeatAnalysisResult:
+        """
+        Equity of every seat at the table, in one pass over the deals.
+        
+        Each seat holds two known cards or None for a random hand. Every
+        simulated deal scores all seats once and hands each winner its
+        fraction of the pot, so a three-way split credits a third to each.
+        When every hand is known and at most two board cards are to come,
+        the runouts are enumerated exactly instead. seed works as in
+        analyze_hand.
+        """
+        start_time = time.time()
+        
+        if not 2 <= len(seats) <= 10:
+            raise ValueError("Between 2 and 10 seats are required")
+        seat_ids = []
+        for seat in seats:
+            if seat is None:
+                seat_ids.append(None)
+            elif len(seat) != 2:
+                raise ValueError("Known seats need exactly 2 hole cards")
+            else:
+                seat_ids.append(encode_cards(seat))
+        community_ids = encode_cards(community_cards)
+        known_ids = [card_id for ids in seat_ids if ids is not None for card_id in ids] + community_ids
+        check_distinct_cards(known_ids)
+        known_mask = cards_mask(known_ids)
+        
+        remaining_deck = remaining_cards(known_mask)
+        cards_needed = 5 - len(community_ids)
+        
+        if all(ids is not None for ids in seat_ids) and cards_needed <= 2:
+            runout_list = list(itertools.combinations(remaining_deck.tolist(), cards_needed))
+            runouts = np.array(runout_list, dtype=np.int64).reshape(len(runout_list), cards_needed)
+            hands = np.broadcast_to(np.array(seat_ids, dtype=np.int64), (len(runouts), len(seats), 2))
+            wins, ties, shares = self._seat_shares(np.array(community_ids, dtype=np.int64), runouts, hands)
+            total = len(runouts)
+            calculation_method = f"Exact Enumeration ({total:,} runouts)"
+            confidence = "exact"
+            run_seed = None
+        else:
+            run_seed = self._resolve_seed(seed)
+            wins, ties, shares, total = self._simulate_seat_shares(
+                seat_ids, community_ids, remaining_deck, simulation_iterations, np.random.default_rng(run_seed)
+            )
+            calculation_method = f"Monte Carlo ({total:,} simulations)"
+            # Worst-case 95% half-width of a pot share estimate
+            confidence = f"±{self.CONFIDENCE_Z * 50 / math.sqrt(total):.2f}%"
+        
+        seat_results = [
+            SeatEquity(
+                seat=seat,
+                hole_cards=[card_label(card_id) for card_id in ids] if ids is not None else None,
+                equity=round(float(shares[seat]) / total * 100, 2),
+                win_probability=round(float(wins[seat]) / total * 100, 2),
+                tie_probability=round(float(ties[seat]) / total * 100, 2)
+            )
+            for seat, ids in enumerate(seat_ids)
+        ]
+        calculations = CalculationDetails(
+            method=calculation_method,
+            confidence=confidence,
+            cards_remaining=len(remaining_deck),
+            simulation_time_ms=int((time.time() - start_time) * 1000),
+            iterations=total if confidence != "exact" else None,
+            seed=run_seed
+        )
+        return SeatAnalysisResult(seats=seat_results, calculations=calculations)
+    
+    def _simulate_seat_shares(
+        self,
+        seat_ids: List[Optional[List[int]]],
+        community_ids: List[int],
+        remaining_deck: np.ndarray,
+        iterations: int,
+        rng: Optional[np.random.Generator] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """Per-seat (wins, ties, pot shares) summed over simulated deals, and the deal count"""
+        cards_needed = 5 - len(community_ids)
+        random_seats = [seat for seat, ids in enumerate(seat_ids) if ids is None]
+        known_seats = [seat for seat, ids in enumerate(seat_ids) if ids is not None]
+        
+        wins = np.zeros(len(seat_ids))
+        ties = np.zeros(len(seat_ids))
+        shares = np.zeros(len(seat_ids))
+        total = 0
+        if rng is None:
+            rng = np.random.default_rng()
+        community = np.array(community_ids, dtype=np.int64)
+        board_tables = self._board_tables(community, len(remaining_deck), iterations, len(seat_ids))
+        while total < iterations:
+            batch_size = min(self.SIMULATION_BATCH_SIZE, iterations - total)
+            deals = self._deal_batch(remaining_deck, cards_needed + 2 * len(random_seats), batch_size, rng)
+            hands = np.empty((batch_size, len(seat_ids), 2), dtype=np.int64)
+            hands[:, known_seats] = np.array([seat_ids[seat] for seat in known_seats], dtype=np.int64).reshape(-1, 2)
+            hands[:, random_seats] = deals[:, cards_needed:].reshape(batch_size, len(random_seats), 2)
+            
+            batch_wins, batch_ties, batch_shares = self._seat_shares(
+                community, deals[:, :cards_needed], hands, board_tables
+            )
+            wins += batch_wins
+            ties += batch_ties
+            shares += batch_shares
+            total += batch_size
+        return wins, ties, shares, total
+    
+    def _seat_shares(
+        self,
+        community_ids: np.ndarray,
+        runouts: np.ndarray,
+        hands: np.ndarray,
+        board_tables: Optional[BoardTables] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score every seat of every deal (runouts: deals x cards, hands: deals x
+        seats x 2) and sum per seat outright wins, split pots and pot shares
+        """
+        combos = COMBO_INDEX[hands[..., 0], hands[..., 1]]
+        scores = self._combo_scores(community_ids, runouts, combos, board_tables)
+        # Lower score = better hand in treys; every seat holding the best score splits the pot
+        winners = scores == scores.min(axis=1, keepdims=True)
+        winner_count = winners.sum(axis=1, keepdims=True)
+        wins = (winners & (winner_count == 1)).sum(axis=0)
+        ties = (winners & (winner_count > 1)).sum(axis=0)
+        shares = (winners / winner_count).sum(axis=0)
+        return wins, ties, shares
+    
+    def analyze_batch(
+        self,
+        items: List[Dict],
+        on_result: Optional[Callable[[int, Union[AnalysisResult, ValueError]], None]] = None
+    ) -> List[Union[AnalysisResult, ValueError]]:
+        """
+        Analyze many spots in one call, in order. Each item holds the keyword
+        arguments of analyze_hand; an item the engine rejects yields its
+        ValueError instead of a result.
+        
+        Items with the same spot and the same other arguments are computed
+        once (see _batch_key): later ones reuse the equity of the first,
+        flagged as cached, and only rebuild their hand descriptions. Other
+        items still go through the equity cache as usual. on_result is
+        called with (index, outcome) as soon as each item is done.
+        """
+        outcomes = []
+        computed: Dict[tuple, AnalysisResult] = {}
+        for index, item in enumerate(items):
+            key = self._batch_key(item)
+            try:
+                if key in computed:
+                    outcome = self._reuse_result(computed[key], item)
+                else:
+                    outcome = self.analyze_hand(**item)
+                    if key is not None:
+                        computed[key] = outcome
+            except ValueError as e:
+                outcome = e
+            outcomes.append(outcome)
+            if on_result is not None:
+                on_result(index, outcome)
+        return outcomes
+    
+    @staticmethod
+    def _batch_key(item: Dict) -> Optional[tuple]:
+        """
+        (spot, settings) key under which batch items share one calculation,
+        or None for items computed on their own (invalid cards, progress
+        callbacks). Unseeded items share suit-isomorphic spots. Seeded items
+        only share identical cards, so each stays reproducible from its seed,
+        and so do items with custom ranges, whose combos can name suits.
+        """
+        if item.get('on_progress') is not None:
+            return None
+        try:
+            hole_ids = encode_cards(item['hole_cards'])
+            community_ids = encode_cards(item['community_cards'])
+        except (KeyError, ValueError):
+            return None
+        settings = tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in item.items() if name not in ('hole_cards', 'community_cards')
+        ))
+        if item.get('seed') is not None or item.get('custom_ranges'):
+            spot = (tuple(hole_ids), tuple(community_ids))
+        else:
+            spot = canonicalize_spot(hole_ids, community_ids, item.get('player_count', 0)).key
+        return spot, settings
+    
+    def _reuse_result(self, result: AnalysisResult, item: Dict) -> AnalysisResult:
+        """Result of a batch item sharing the calculation of an earlier one"""
+        if item.get('cancel_token') is not None:
+            item['cancel_token'].check()
+        hole_ids = encode_cards(item['hole_cards'])
+        community_ids = encode_cards(item['community_cards'])
+        current_hand = self._evaluate_current_hand(hole_ids, community_ids)
+        probabilities = {
+            'win': result.win_probability, 'tie': result.tie_probability, 'lose': result.lose_probability
+        }
+        return dataclasses.replace(
+            result,
+            hand_strength=current_hand,
+            recommendation=self._generate_recommendation(probabilities, current_hand),
+            calculations=dataclasses.replace(result.calculations, cached=True)
         )
     
     def _monte_carlo_simulation(
@@ -130,85 +674,678 @@ class PokerEngine:
         hole_cards: List[int], 
         community_cards: List[int], 
         player_count: int,
-        iterations: int
-    ) -> Dict[str, float]:
+        iterations: int,
+        target_precision: Optional[float] = None,
+        on_progress: Optional[Callable[[SimulationProgress], None]] = None,
+        opponent_ranges: Optional[List[Optional[HandRange]]] = None,
+        seed: Optional[int] = None,
+        deadline: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int, int]:
+        """
+        Perform Monte Carlo simulation and return (wins, ties, simulations run).
+        
+        With on_progress, the simulation runs in-process and reports running
+        estimates after the first batch and then at most every
+        PROGRESS_INTERVAL_SECONDS. With a deadline (time.time() value), it
+        also runs in-process and stops before a batch that, taking as long
+        as the previous one, would end past the deadline. The same seed
+        gives the same counts for a given worker count (and, with a
+        deadline, the same number of batches). cancel_token is checked after
+        every batch, or while waiting for the worker processes.
+        """
+        if on_progress is None and deadline is None:
+            if target_precision is None and self.parallel_simulator is not None and iterations >= self.PARALLEL_MIN_ITERATIONS:
+                return self.parallel_simulator.simulate_counts(
+                    hole_cards, community_cards, player_count, iterations, seed, opponent_ranges, cancel_token
+                )
+            if cancel_token is None:
+                return self._simulate_counts(
+                    hole_cards, community_cards, player_count, iterations, np.random.default_rng(seed),
+                    target_precision=target_precision, opponent_ranges=opponent_ranges
+                )
+        
+        counts = (0, 0, 0)
+        last_report = None
+        batch_start = time.time()
+        for counts in self._iter_simulation(
+            hole_cards, community_cards, player_count, iterations, np.random.default_rng(seed),
+            target_precision=target_precision, opponent_ranges=opponent_ranges
+        ):
+            if cancel_token is not None:
+                cancel_token.check(counts[2] / iterations)
+            now = time.time()
+            if on_progress is not None and (last_report is None or now - last_report >= self.PROGRESS_INTERVAL_SECONDS):
+                on_progress(self._progress(*counts, iterations))
+                last_report = now
+            if deadline is not None and now + (now - batch_start) > deadline:
+                break
+            batch_start = now
+        return counts
+    
+    def _plan(
+        self,
+        spot_key: int,
+        community_cards_count: int,
+        player_count: int,
+        simulation_iterations: int,
+        max_latency_ms: float,
+        opponent_ranges: Optional[List[Optional[HandRange]]],
+        seed: Optional[int]
+    ) -> Tuple[PlanEstimate, Optional[CachedEquity]]:
+        """
+        Most accurate calculation of a spot that fits the latency budget, with
+        the cached result to serve when the plan is to reuse it
+        """
+        # Ranged and seeded requests never reuse cached results
+        cached = None
+        if opponent_ranges is None and seed is None:
+            cached = self.equity_cache.peek(spot_key)
+        estimates = self.planner.estimates(
+            community_cards_count, player_count, simulation_iterations, max_latency_ms,
+            table_trials=self.preflop_table.trials if self.preflop_table is not None else None,
+            ranged_opponents=sum(hand_range is not None for hand_range in opponent_ranges or []),
+            cached_error=cached.half_width if cached is not None else None
+        )
+        plan = self.planner.choose(estimates, max_latency_ms)
+        if plan.strategy != "cache":
+            return plan, None
+        cached = self.equity_cache.get(spot_key, 0)
+        if cached is None:
+            # Evicted since the peek: best plan that computes the result
+            plan = self.planner.choose(
+                [estimate for estimate in estimates if estimate.strategy != "cache"], max_latency_ms
+            )
+        return plan, cached
+    
+    def _plan_label(self, plan: PlanEstimate, max_latency_ms: float) -> str:
+        """Planner decision as reported after the calculation method"""
+        return (
+            f" [planner: {plan.strategy}, est. {plan.estimated_ms:,.0f} ms / {max_latency_ms:,.0f} ms budget,"
+            f" expected ±{plan.expected_error:.2f}%]"
+        )
+    
+    def _record_throughput(
+        self,
+        use_exact: bool,
+        use_analytic: bool,
+        sampling: str,
+        community_cards_count: int,
+        player_count: int,
+        iterations: Optional[int],
+        elapsed_ms: float
+    ):
+        """Feed the measured cost of a calculation back into the planner"""
+        if use_exact:
+            strategy = "exact"
+        elif use_analytic:
+            # Preflop analytic runs sample their boards, unlike the planned flop and later runs
+            if community_cards_count < 3:
+                return
+            strategy = "analytic"
+        elif sampling in ("random", "hybrid"):
+            strategy = "monte_carlo" if sampling == "random" else "hybrid"
+        else:
+            return
+        evaluations = self.planner.evaluations(strategy, community_cards_count, player_count, iterations or 0)
+        self.planner.record(strategy, evaluations, elapsed_ms)
+    
+    def _resolve_seed(self, seed: Optional[int]) -> int:
+        """The requested seed, or a fresh random one"""
+        return seed if seed is not None else secrets.randbits(self.SEED_BITS)
+    
+    def _progress(self, wins: int, ties: int, total: int, iterations_target: int) -> SimulationProgress:
+        """Running estimate of a simulation after `total` deals"""
+        probabilities = self._to_probabilities(wins, ties, total)
+        low, high = self._wilson_interval(wins, total)
+        return SimulationProgress(
+            iterations=total,
+            iterations_target=iterations_target,
+            win_probability=probabilities['win'],
+            tie_probability=probabilities['tie'],
+            lose_probability=probabilities['lose'],
+            win_interval=[round(low, 2), round(high, 2)]
+        )
+    
+    def _simulate_counts(
+        self,
+        hole_cards: List[int],
+        community_cards: List[int],
+        player_count: int,
+        iterations: int,
+        rng: Optional[np.random.Generator] = None,
+        target_precision: Optional[float] = None,
+        opponent_ranges: Optional[List[Optional[HandRange]]] = None
+    ) -> Tuple[int, int, int]:
         """
-        Perform Monte Carlo simulation to calculate win probabilities
+        Run the Monte Carlo simulation and return raw (wins, ties, total) counts
+        """
+        counts = (0, 0, 0)
+        for counts in self._iter_simulation(
+            hole_cards, community_cards, player_count, iterations, rng, target_precision, opponent_ranges
+        ):
+            pass
+        return counts
+    
+    def _iter_simulation(
+        self,
+        hole_cards: List[int],
+        community_cards: List[int],
+        player_count: int,
+        iterations: int,
+        rng: Optional[np.random.Generator] = None,
+        target_precision: Optional[float] = None,
+        opponent_ranges: Optional[List[Optional[HandRange]]] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Generator form of the Monte Carlo simulation, yielding the running
+        (wins, ties, total) counts after every batch.
+        
+        Trials are dealt and scored in NumPy batches: every row of a batch is
+        one deal (board runout plus opponent hands) and the 7-card hands of
+        the batch are ranked with the lookup evaluator at once. Random
+        opponents are dealt (by the engine's deck sampler) and scored one
+        seat at a time, only on the deals the hero has not lost yet (see
+        _early_exit_counts).
+        With target_precision the loop stops after the first batch at which
+        the win probability half-width is small enough (sequential stopping).
+        opponent_ranges gives one HandRange (or None for a random hand) per
+        opponent, see _deal_ranged_batch.
         """
         wins = 0
         ties = 0
         total_simulations = 0
         
-        # Create deck and remove known cards
-        deck = Deck()
-        known_cards = hole_cards + community_cards
-        remaining_deck = [card for card in deck.cards if card not in known_cards]
+        # Remove known cards from the deck
+        hole_ids = np.array(hole_cards, dtype=np.int64)
+        community_ids = np.array(community_cards, dtype=np.int64)
+        dead_mask = cards_mask(itertools.chain(hole_ids, community_ids))
+        remaining_deck = remaining_cards(dead_mask)
         
-        for _ in range(iterations):
-            # Shuffle remaining deck
-            random.shuffle(remaining_deck)
-            
-            # Complete the community cards if needed
-            cards_needed = 5 - len(community_cards)
-            simulated_board = community_cards + remaining_deck[:cards_needed]
+        # Skip simulation if we don't have enough cards
+        cards_needed = 5 - len(community_cards)
+        if cards_needed + 2 * (player_count - 1) > len(remaining_deck):
+            return
+        
+        samplers = None
+        if opponent_ranges is not None:
+            samplers = [
+                hand_range.sampler(dead_mask) if hand_range is not None else None
+                for hand_range in opponent_ranges
+            ]
+        
+        board_tables = self._board_tables(community_ids, len(remaining_deck), iterations, player_count)
+        hero_combo = COMBO_INDEX[hole_ids[0], hole_ids[1]]
+        
+        # Sampler buffers are reused by every batch
+        deck_sampler = self.deck_sampler(remaining_deck, min(self.SIMULATION_BATCH_SIZE, iterations))
+        
+        if rng is None:
+            rng = np.random.default_rng()
+        while total_simulations < iterations:
+            batch_size = min(self.SIMULATION_BATCH_SIZE, iterations - total_simulations)
+            if samplers is None:
+                deck_sampler.reset(batch_size, rng)
+                batch_wins, batch_ties = self._early_exit_counts(
+                    hero_combo, community_ids, deck_sampler, batch_size, cards_needed, player_count - 1,
+                    board_tables
+                )
+            else:
+                deals = self._deal_ranged_batch(remaining_deck, samplers, cards_needed, batch_size, rng)
+                batch_wins, batch_ties = self._score_deals(
+                    hole_ids, community_ids, deals, cards_needed, player_count, board_tables
+                )
+            wins += batch_wins
+            ties += batch_ties
+            total_simulations += batch_size
+            yield wins, ties, total_simulations
             
-            # Deal opponent hands
-            opponent_hands = []
-            card_index = cards_needed
-            for _ in range(player_count - 1):
-                opponent_hand = remaining_deck[card_index:card_index + 2]
-                opponent_hands.append(opponent_hand)
-                card_index += 2
+            if target_precision is not None:
+                low, high = self._wilson_interval(wins, total_simulations)
+                if (high - low) / 2 <= target_precision:
+                    break
+    
+    def _deal_batch(
+        self,
+        remaining_deck: np.ndarray,
+        cards_per_deal: int,
+        batch_size: int,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Deal batch_size independent hands of cards_per_deal cards each, using a
+        partial Fisher-Yates shuffle run on all rows at once. remaining_deck is
+        either one deck shared by every row or a (batch_size, n) array of decks.
+        """
+        sampler = FisherYatesSampler(remaining_deck, batch_size)
+        sampler.reset(batch_size, rng)
+        return sampler.deal(np.arange(batch_size), cards_per_deal)
+    
+    def _early_exit_counts(
+        self,
+        hero_combo: int,
+        community_ids: np.ndarray,
+        deck_sampler: DeckSampler,
+        batch_size: int,
+        cards_needed: int,
+        opponents: int,
+        board_tables: Optional[BoardTables] = None
+    ) -> Tuple[int, int]:
+        """
+        Hero (wins, ties) over one batch of random deals, dealt by a deck
+        sampler that was just reset for batch_size rows.
+        
+        The runout is dealt and the hero scored on every row, then opponents
+        are dealt and scored one seat at a time on the rows the hero has not
+        lost yet; a row leaves as soon as an opponent beats the hero. Cards
+        are only dealt to opponents that are scored, which leaves the
+        distribution of every deal that still matters unchanged.
+        """
+        rows = np.arange(batch_size)
+        runouts = deck_sampler.deal(rows, cards_needed)
+        boards = None
+        if board_tables is None:
+            boards = self.evaluator.board_state(community_ids).extend(runouts)
+        
+        def score(live: np.ndarray, combos: np.ndarray) -> np.ndarray:
+            if board_tables is not None:
+                return board_tables.scores(runouts[live], combos[:, None])[:, 0]
+            return boards.select(live).score_combos(combos[:, None])[:, 0]
+        
+        hero_scores = score(rows, np.full(len(rows), hero_combo))
+        live = rows
+        tied = np.zeros(len(rows), dtype=bool)
+        for _ in range(opponents):
+            hands = deck_sampler.deal(live, 2)
+            opponent_scores = score(live, COMBO_INDEX[hands[:, 0], hands[:, 1]])
             
-            # Skip simulation if we don't have enough cards
-            if card_index > len(remaining_deck):
-                continue
-                
-            # Evaluate all hands
-            hero_score = self.evaluator.evaluate(simulated_board, hole_cards)
-            opponent_scores = [
-                self.evaluator.evaluate(simulated_board, opp_hand) 
-                for opp_hand in opponent_hands
-            ]
+            # Lower score = better hand in treys
+            live_hero = hero_scores[live]
+            tied[live[opponent_scores == live_hero]] = True
+            live = live[opponent_scores >= live_hero]
+            if not len(live):
+                break
+        
+        ties = int(np.count_nonzero(tied[live]))
+        return len(live) - ties, ties
+    
+    def _deal_ranged_batch(
+        self,
+        remaining_deck: np.ndarray,
+        samplers: List,
+        cards_needed: int,
+        batch_size: int,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Deal batch_size deals laid out like _deal_batch (runout, then two cards
+        per opponent) where opponents with a RangeSampler draw their holding
+        from their range. Ranged opponents are dealt first, each conditioned
+        on the ranged opponents before it; random hands and the runout are then
+        uniform over the cards left in each row.
+        """
+        row_masks = np.zeros(batch_size, dtype=np.uint64)
+        opponent_cards = [None] * len(samplers)
+        for seat, sampler in enumerate(samplers):
+            if sampler is not None:
+                combos = sampler.sample(row_masks, rng)
+                opponent_cards[seat] = COMBO_CARDS[combos]
+                row_masks |= COMBO_MASKS[combos]
+        for seat, sampler in enumerate(samplers):
+            if sampler is None:
+                opponent_cards[seat] = draw_uniform(remaining_deck, row_masks, 2, rng)
+        runout = draw_uniform(remaining_deck, row_masks, cards_needed, rng)
+        return np.concatenate([runout] + opponent_cards, axis=1)
+    
+    def _score_deals(
+        self,
+        hole_ids: np.ndarray,
+        community_ids: np.ndarray,
+        deals: np.ndarray,
+        cards_needed: int,
+        player_count: int,
+        board_tables: Optional[BoardTables] = None
+    ) -> Tuple[int, int]:
+        """
+        Count hero wins and ties over a batch of deals. Each deal row holds the
+        board runout followed by two cards per opponent.
+        """
+        hero_wins, hero_ties = self._deal_outcomes(
+            hole_ids, community_ids, deals, cards_needed, player_count, board_tables
+        )
+        return int(np.count_nonzero(hero_wins)), int(np.count_nonzero(hero_ties))
+    
+    def _deal_outcomes(
+        self,
+        hole_ids: np.ndarray,
+        community_ids: np.ndarray,
+        deals: np.ndarray,
+        cards_needed: int,
+        player_count: int,
+        board_tables: Optional[BoardTables] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-deal boolean arrays telling whether the hero wins outright or ties
+        """
+        # Every player's hand as a combo index, hero first
+        combos = np.empty((len(deals), player_count), dtype=np.int64)
+        combos[:, 0] = COMBO_INDEX[hole_ids[0], hole_ids[1]]
+        combos[:, 1:] = COMBO_INDEX[deals[:, cards_needed::2], deals[:, cards_needed + 1::2]]
+        scores = self._combo_scores(community_ids, deals[:, :cards_needed], combos, board_tables)
+        
+        # Lower score = better hand in treys; hero ties when sharing the best score
+        best_opponent = scores[:, 1:].min(axis=1)
+        return scores[:, 0] < best_opponent, scores[:, 0] == best_opponent
+    
+    def _combo_scores(
+        self,
+        community_ids: np.ndarray,
+        runouts: np.ndarray,
+        combos: np.ndarray,
+        board_tables: Optional[BoardTables] = None
+    ) -> np.ndarray:
+        """
+        Hand ranks of combos (deals x players) on the known board completed by
+        each deal's runout: board state is built once per deal and shared by
+        every player, or read from memoized per-board tables
+        """
+        if board_tables is not None:
+            return board_tables.scores(runouts, combos)
+        return self.evaluator.board_state(community_ids).extend(runouts).score_combos(combos)
+    
+    def _board_tables(
+        self,
+        community_ids: np.ndarray,
+        remaining_cards: int,
+        iterations: int,
+        player_count: int
+    ) -> Optional[BoardTables]:
+        """
+        Memoized per-board score tables when building them (1326 hands per
+        reachable board) is cheaper than scoring every player of every deal
+        """
+        cards_needed = 5 - len(community_ids)
+        if cards_needed > 2:
+            return None
+        if BoardTables.board_count(remaining_cards, cards_needed) * COMBO_COUNT > iterations * player_count:
+            return None
+        return BoardTables(self.evaluator, community_ids, cards_needed)
+    
+    def _stratified_simulate_counts(
+        self,
+        hole_cards: List[int],
+        community_cards: List[int],
+        player_count: int,
+        iterations: int,
+        rng: Optional[np.random.Generator] = None,
+        enumerate_runouts: bool = False,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int, int, float]:
+        """
+        Variance-reduced Monte Carlo returning (wins, ties, deals, win half-width %).
+        
+        Stratified runouts: the next one or two board cards (the turn, or turn
+        and river on the flop when the budget allows every pair a few boards)
+        are enumerated and each value gets the same number of sampled boards,
+        which removes the between-runout part of the variance.
+        Paired opponent deals: every sampled board is played against two
+        disjoint opponent deals taken from the same shuffle, so board dealing
+        and scoring are shared and the pair is averaged before the variance
+        is estimated. The half-width comes from the stratified variance, not
+        from the binomial formula.
+        
+        enumerate_runouts (hybrid sampling, at most two cards to come): every
+        complete runout is its own stratum whatever the budget, so the board
+        adds no variance at all and only opponent holdings are sampled, an
+        equal share of the iterations per runout (at least two pairs).
+        """
+        hole_ids = np.array(hole_cards, dtype=np.int64)
+        community_ids = np.array(community_cards, dtype=np.int64)
+        dead_mask = cards_mask(itertools.chain(hole_ids, community_ids))
+        remaining_deck = remaining_cards(dead_mask)
+        
+        cards_needed = 5 - len(community_cards)
+        opponent_cards = 2 * (player_count - 1)
+        if cards_needed + 2 * opponent_cards > len(remaining_deck):
+            return 0, 0, 0, 100.0
+        
+        # Pick the finest stratification that still leaves enough boards per stratum
+        boards_wanted = max(1, iterations // 2)
+        stratum_size = 0
+        if enumerate_runouts:
+            if cards_needed > 2:
+                raise ValueError("Runouts can only be enumerated with at most two cards to come")
+            stratum_size = cards_needed
+        else:
+            for size in (2, 1):
+                if size <= cards_needed and math.comb(len(remaining_deck), size) * self.STRATUM_MIN_BOARDS <= boards_wanted:
+                    stratum_size = size
+                    break
+        stratum_list = list(itertools.combinations(range(len(remaining_deck)), stratum_size))
+        strata = np.array(stratum_list, dtype=np.int64).reshape(len(stratum_list), stratum_size)
+        boards_per_stratum = max(2, boards_wanted // len(strata))
+        rest_decks = np.array([np.delete(remaining_deck, stratum) for stratum in strata])
+        free_board_cards = cards_needed - stratum_size
+        
+        # Both deals of a board share its score table
+        board_tables = self._board_tables(community_ids, len(remaining_deck), iterations, player_count)
+        
+        if rng is None:
+            rng = np.random.default_rng()
+        wins = 0
+        ties = 0
+        deals_run = 0
+        variance_sum = 0.0
+        strata_per_chunk = max(1, self.SIMULATION_BATCH_SIZE // boards_per_stratum)
+        for chunk_start in range(0, len(strata), strata_per_chunk):
+            if cancel_token is not None:
+                cancel_token.check(chunk_start / len(strata))
+            chunk = slice(chunk_start, chunk_start + strata_per_chunk)
+            fixed_cards = np.repeat(remaining_deck[strata[chunk]], boards_per_stratum, axis=0)
+            dealt = self._deal_batch(
+                np.repeat(rest_decks[chunk], boards_per_stratum, axis=0),
+                free_board_cards + 2 * opponent_cards,
+                len(fixed_cards),
+                rng
+            )
+            board_cards = np.concatenate([fixed_cards, dealt[:, :free_board_cards]], axis=1)
+            first_opponents = dealt[:, free_board_cards:free_board_cards + opponent_cards]
+            second_opponents = dealt[:, free_board_cards + opponent_cards:]
             
-            # Determine result (lower score = better hand in treys)
-            all_scores = [hero_score] + opponent_scores
-            min_score = min(all_scores)
-            winners = [i for i, score in enumerate(all_scores) if score == min_score]
+            board_wins = np.zeros(len(board_cards))
+            for opponents in (first_opponents, second_opponents):
+                hero_wins, hero_ties = self._deal_outcomes(
+                    hole_ids, community_ids, np.concatenate([board_cards, opponents], axis=1),
+                    cards_needed, player_count, board_tables
+                )
+                wins += int(np.count_nonzero(hero_wins))
+                ties += int(np.count_nonzero(hero_ties))
+                board_wins += hero_wins / 2
+            deals_run += 2 * len(board_cards)
             
-            if len(winners) == 1 and 0 in winners:  # Hero wins alone
-                wins += 1
-            elif 0 in winners:  # Hero ties
-                ties += 1
-            # else: Hero loses (implicit)
+            stratum_wins = board_wins.reshape(-1, boards_per_stratum)
+            variance_sum += float((stratum_wins.var(axis=1, ddof=1) / boards_per_stratum).sum())
+        
+        half_width = self.CONFIDENCE_Z * math.sqrt(variance_sum) / len(strata) * 100
+        return wins, ties, deals_run, half_width
+    
+    def _analytic_multiway(
+        self,
+        hole_cards: List[int],
+        community_cards: List[int],
+        player_count: int,
+        iterations: int,
+        rng: np.random.Generator,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[Dict[str, float], int, Optional[float]]:
+        """
+        Multiway equity without dealing opponent hands. Returns
+        (probabilities, boards, win half-width %), the half-width being None
+        when every runout was enumerated.
+        
+        Boards are all runouts when at most two cards are to come, else a
+        sample sized like the Monte Carlo budget. On each board every live
+        holding is ranked once against the hero: the hero wins when all
+        opponents hold a losing holding, and wins or ties when all hold a
+        losing or tying one. Those probabilities come from the set sizes with
+        card removal (see _opponent_set_counts), so the cost per board hardly
+        grows with the number of opponents.
+        """
+        hole_ids = np.array(hole_cards, dtype=np.int64)
+        community_ids = np.array(community_cards, dtype=np.int64)
+        dead_mask = cards_mask(itertools.chain(hole_ids, community_ids))
+        remaining_deck = remaining_cards(dead_mask)
+        cards_needed = 5 - len(community_ids)
+        opponents = player_count - 1
+        
+        enumerated = cards_needed <= 2
+        if enumerated:
+            runout_list = list(itertools.combinations(remaining_deck.tolist(), cards_needed))
+            runouts = np.array(runout_list, dtype=np.int64).reshape(len(runout_list), cards_needed)
+        else:
+            board_count = max(self.ANALYTIC_MIN_BOARDS, iterations * player_count // COMBO_COUNT)
+            runouts = self._deal_batch(remaining_deck, cards_needed, board_count, rng)
+        
+        hero_combo = COMBO_INDEX[hole_ids[0], hole_ids[1]]
+        boards = self.evaluator.board_state(community_ids)
+        win_chances = []
+        tie_chances = []
+        for start in range(0, len(runouts), self.ANALYTIC_BOARD_CHUNK):
+            if cancel_token is not None:
+                cancel_token.check(start / len(runouts))
+            chunk = runouts[start:start + self.ANALYTIC_BOARD_CHUNK]
+            scores = boards.extend(chunk).combo_table()
+            hero_scores = scores[:, hero_combo, None]
+            runout_masks = (np.uint64(1) << chunk.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+            live = (COMBO_MASKS[None, :] & (runout_masks[:, None] | dead_mask)) == 0
             
-            total_simulations += 1
+            # Lower score = better hand in treys
+            live_counts = self._opponent_set_counts(live, opponents)
+            win = np.prod(self._opponent_set_counts(live & (scores > hero_scores), opponents) / live_counts, axis=1)
+            win_or_tie = np.prod(
+                self._opponent_set_counts(live & (scores >= hero_scores), opponents) / live_counts, axis=1
+            )
+            win_chances.append(win)
+            tie_chances.append(win_or_tie - win)
         
-        if total_simulations == 0:
-            return {'win': 0.0, 'tie': 0.0, 'lose': 100.0}
+        win_chances = np.concatenate(win_chances)
+        tie_chances = np.concatenate(tie_chances)
+        probabilities = self._to_probabilities(float(win_chances.sum()), float(tie_chances.sum()), len(runouts))
+        half_width = None
+        if not enumerated:
+            half_width = self.CONFIDENCE_Z * float(win_chances.std(ddof=1)) / math.sqrt(len(runouts)) * 100
+        return probabilities, len(runouts), half_width
+    
+    def _opponent_set_counts(self, holdings: np.ndarray, opponents: int) -> np.ndarray:
+        """
+        Expected number of holdings of a set (boards x 1326 booleans) left to
+        each successive opponent when every earlier one was dealt a holding of
+        the set (boards x opponents).
         
-        win_prob = (wins / total_simulations) * 100
-        tie_prob = (ties / total_simulations) * 100
-        lose_prob = 100 - win_prob - tie_prob
+        Every card carries the probability that it is still in the deck.
+        Dealing a holding of the set removes card c with probability
+        survival[c] * degree[c] / count, where degree[c] sums the survival of
+        the cards paired with c in the set and count is the expected number of
+        set holdings left. The ratio of these counts for a set and for all
+        live holdings is the chance that the next opponent lands in the set:
+        exact for the first opponent, card removal tracked card by card for
+        the others.
+        """
+        adjacency = np.zeros((len(holdings), 52, 52), dtype=np.float32)
+        adjacency[:, COMBO_CARDS[:, 0], COMBO_CARDS[:, 1]] = holdings
+        adjacency[:, COMBO_CARDS[:, 1], COMBO_CARDS[:, 0]] = holdings
+        survival = (adjacency.sum(axis=2) > 0).astype(np.float32)
         
-        return {
-            'win': round(win_prob, 2),
-            'tie': round(tie_prob, 2),
-            'lose': round(lose_prob, 2)
-        }
+        counts = np.empty((len(holdings), opponents))
+        for opponent in range(opponents):
+            degrees = np.matmul(adjacency, survival[:, :, None])[:, :, 0]
+            count = (survival * degrees).sum(axis=1) / 2
+            counts[:, opponent] = count
+            removal = np.divide(degrees, count[:, None], out=np.zeros_like(degrees), where=count[:, None] > 0)
+            survival = np.maximum(survival * (1 - removal), 0)
+        return counts
+    
+    def _can_enumerate(self, community_cards_count: int, player_count: int) -> bool:
+        """
+        Exact enumeration is cheap enough heads-up once the flop is known
+        (at most 1,081 runouts x 990 holdings on the flop)
+        """
+        return player_count == 2 and community_cards_count >= 3
     
     def _combinatorial_analysis(
         self, 
         hole_cards: List[int], 
         community_cards: List[int], 
         player_count: int
-    ) -> Dict[str, float]:
+    ) -> Tuple[Dict[str, float], int]:
+        """
+        Use exact combinatorial analysis when few cards remain.
+        
+        Walks every remaining board runout and every opponent holding (with
+        card removal) and returns the exact probabilities together with the
+        number of combinations that were evaluated. All (runout, holding)
+        pairs are scored at once from the board state of each runout plus the
+        precomputed components of each holding.
+        """
+        if player_count != 2:
+            raise ValueError("Exact enumeration only supports heads-up spots")
+        
+        remaining = remaining_cards(cards_mask(hole_cards + community_cards)).tolist()
+        cards_needed = 5 - len(community_cards)
+        
+        runout_list = list(itertools.combinations(remaining, cards_needed))
+        runouts = np.array(runout_list, dtype=np.int64).reshape(len(runout_list), cards_needed)
+        holdings = np.array(list(itertools.combinations(remaining, 2)), dtype=np.int64)
+        
+        # One score table per runout: the board is hashed once for every holding
+        boards = self.evaluator.board_state(np.array(community_cards, dtype=np.int64)).extend(runouts)
+        combos = np.append(COMBO_INDEX[holdings[:, 0], holdings[:, 1]], COMBO_INDEX[hole_cards[0], hole_cards[1]])
+        scores = boards.score_combos(combos)
+        hero_scores = scores[:, -1:]
+        opponent_scores = scores[:, :-1]
+        
+        # Opponent holdings cannot reuse a card dealt to the runout
+        runout_masks = (np.int64(1) << runouts).sum(axis=1)
+        holding_masks = (np.int64(1) << holdings).sum(axis=1)
+        live = (runout_masks[:, None] & holding_masks[None, :]) == 0
+        
+        # Lower score = better hand in treys
+        wins = int(np.count_nonzero(live & (hero_scores < opponent_scores)))
+        ties = int(np.count_nonzero(live & (hero_scores == opponent_scores)))
+        total = int(np.count_nonzero(live))
+        
+        return self._to_probabilities(wins, ties, total), total
+    
+    def _wilson_interval(self, successes: int, total: int) -> Tuple[float, float]:
+        """
+        95% Wilson score interval for a simulated probability, in percent
         """
-        Use exact combinatorial analysis when few cards remain
+        if total == 0:
+            return 0.0, 100.0
+        
+        z = self.CONFIDENCE_Z
+        p = successes / total
+        denominator = 1 + z * z / total
+        center = (p + z * z / (2 * total)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+        return float(center - margin) * 100, float(center + margin) * 100
+    
+    def _to_probabilities(self, wins: int, ties: int, total: int) -> Dict[str, float]:
         """
-        # For now, fall back to Monte Carlo with high precision
-        # This can be optimized later with exact enumeration
-        return self._monte_carlo_simulation(hole_cards, community_cards, player_count, 50000)
+        Convert raw win/tie counts into rounded percentages
+        """
+        if total == 0:
+            return {'win': 0.0, 'tie': 0.0, 'lose': 100.0}
+        
+        win_prob = (wins / total) * 100
+        tie_prob = (ties / total) * 100
+        lose_prob = 100 - win_prob - tie_prob
+        
+        return {
+            'win': round(win_prob, 2),
+            'tie': round(tie_prob, 2),
+            'lose': round(lose_prob, 2)
+        }
     
     def _evaluate_current_hand(self, hole_cards: List[int], community_cards: List[int]) -> HandStrength:
         """
@@ -223,8 +1360,8 @@ class PokerEngine:
             # Incomplete board - use alternative analysis
             return self._analyze_incomplete_hand(hole_cards, community_cards)
         
-        # Complete board (5 cards) - use treys evaluator
-        hand_rank = self.evaluator.evaluate(community_cards, hole_cards)
+        # Complete board (5 cards) - use the lookup evaluator (same ranks as treys)
+        hand_rank = self.evaluator.evaluate_ids(community_cards + hole_cards)
         hand_class = self.evaluator.get_rank_class(hand_rank)
         
         # Map treys hand classes to readable descriptions
@@ -254,10 +1391,6 @@ class PokerEngine:
         """
         Analyze hand strength with incomplete board (flop/turn scenarios)
         """
-        # Convert cards to readable format for analysis
-        hole_readable = [TreysCard.int_to_pretty_str(card) for card in hole_cards]
-        community_readable = [TreysCard.int_to_pretty_str(card) for card in community_cards]
-        
         # Analyze what we have and potential draws
         all_cards = hole_cards + community_cards
         
@@ -313,13 +1446,13 @@ class PokerEngine:
             high_card = max(ranks)
             return HandStrength("High Card", f"{self._rank_to_name(high_card)} high", 2, "high_card")
     
-    def _get_card_rank_value(self, card_int: int) -> int:
-        """Extract rank value from treys card integer"""
-        return (card_int >> 8) & 0xF
+    def _get_card_rank_value(self, card_id: int) -> int:
+        """Rank value of a card id (2..14, ace high)"""
+        return card_id // 4 + 2
     
-    def _get_card_suit(self, card_int: int) -> int:
-        """Extract suit from treys card integer"""
-        return card_int & 0xF
+    def _get_card_suit(self, card_id: int) -> int:
+        """Suit of a card id (0..3 for spades, hearts, diamonds, clubs)"""
+        return card_id % 4
     
     def _rank_to_name(self, rank_value: int) -> str:
         """Convert rank value to readable name"""
@@ -331,7 +1464,7 @@ class PokerEngine:
     def _get_flush_suit_name(self, suit_counts: dict) -> str:
         """Get the name of the flush suit"""
         max_suit = max(suit_counts.items(), key=lambda x: x[1])[0]
-        suit_names = {1: "Spades", 2: "Hearts", 4: "Diamonds", 8: "Clubs"}
+        suit_names = {0: "Spades", 1: "Hearts", 2: "Diamonds", 3: "Clubs"}
         return suit_names.get(max_suit, "Unknown")
     
     def _check_straight_potential(self, sorted_ranks: List[int]) -> tuple:
@@ -363,48 +1496,12 @@ class PokerEngine:
         if len(hole_cards) != 2:
             return HandStrength("Unknown", "Invalid hand", 1, "unknown")
         
-        # Convert to readable format for analysis
-        card1_str = TreysCard.int_to_pretty_str(hole_cards[0])
-        card2_str = TreysCard.int_to_pretty_str(hole_cards[1])
-        
-        rank1 = card1_str[0]
-        rank2 = card2_str[0]
-        suit1 = card1_str[1]
-        suit2 = card2_str[1]
-        
-        is_pair = rank1 == rank2
-        is_suited = suit1 == suit2
-        
-        if is_pair:
-            if rank1 in ['A', 'K', 'Q', 'J']:
-                return HandStrength("Premium Pair", f"Pair of {rank1}s", 8, "premium")
-            else:
-                return HandStrength("Pocket Pair", f"Pair of {rank1}s", 6, "strong")
-        
-        if is_suited:
-            if rank1 in ['A', 'K'] and rank2 in ['A', 'K']:
-                return HandStrength("Premium Suited", f"{rank1}{rank2} suited", 7, "premium")
-            else:
-                return HandStrength("Suited Cards", f"{rank1}{rank2} suited", 5, "playable")
-        
-        if rank1 in ['A', 'K'] and rank2 in ['A', 'K']:
-            return HandStrength("Premium Offsuit", f"{rank1}{rank2} offsuit", 6, "strong")
-        
-        return HandStrength("High Cards", f"{rank1}{rank2} offsuit", 3, "marginal")
-        """
-        Analyze pre-flop hand strength
-        """
-        if len(hole_cards) != 2:
-            return HandStrength("Unknown", "Invalid hand", 1, "unknown")
-        
-        # Convert to readable format for analysis
-        card1_str = TreysCard.int_to_pretty_str(hole_cards[0])
-        card2_str = TreysCard.int_to_pretty_str(hole_cards[1])
-        
-        rank1 = card1_str[0]
-        rank2 = card2_str[0]
-        suit1 = card1_str[1]
-        suit2 = card2_str[1]
+        # Higher card first, so descriptions read "AK" rather than "KA"
+        high, low = sorted(hole_cards, reverse=True)
+        rank1 = RANK_CHARS[high // 4]
+        rank2 = RANK_CHARS[low // 4]
+        suit1 = self._get_card_suit(high)
+        suit2 = self._get_card_suit(low)
         
         is_pair = rank1 == rank2
         is_suited = suit1 == suit2
@@ -444,22 +1541,69 @@ class PokerEngine:
         
         return class_descriptions.get(hand_class, "Unknown hand")
     
-    def _generate_opponent_ranges(self, player_count: int) -> List[OpponentRange]:
+    def _resolve_opponent_ranges(
+        self,
+        opponent_profiles: Optional[List[str]],
+        player_count: int,
+        custom_ranges: Optional[List[str]] = None
+    ) -> Optional[List[Optional[HandRange]]]:
         """
-        Generate opponent range analysis based on player count
+        Hand range per opponent for the requested profiles or custom ranges
+        (None for random opponents), or None when every opponent is random
         """
-        profiles = [
-            ("Tight-Aggressive", "15-20% of hands", ["High pairs (99+)", "Strong aces (AQ+)", "Suited connectors (JT+)"]),
-            ("Loose-Aggressive", "25-35% of hands", ["Medium pairs (66+)", "Suited cards", "Broadway cards"]),
-            ("Tight-Passive", "10-15% of hands", ["Premium pairs (JJ+)", "Strong aces (AK, AQ)"]),
-            ("Loose-Passive", "30-45% of hands", ["Any pair", "Suited cards", "Face cards", "Connecting cards"])
-        ]
+        if custom_ranges is not None:
+            if opponent_profiles is not None:
+                raise ValueError("Opponent profiles and custom ranges cannot be combined")
+            if len(custom_ranges) != player_count - 1:
+                raise ValueError("One custom range is required per opponent")
+            return [compile_range(notation) for notation in custom_ranges]
+        
+        if opponent_profiles is None:
+            return None
+        if len(opponent_profiles) != player_count - 1:
+            raise ValueError("One opponent profile is required per opponent")
         
-        # Return appropriate number of opponent profiles
-        opponents_needed = min(player_count - 1, len(profiles))
+        opponent_ranges = []
+        for profile in opponent_profiles:
+            if profile == RANDOM_PROFILE:
+                opponent_ranges.append(None)
+            elif profile in self.profile_ranges:
+                opponent_ranges.append(self.profile_ranges[profile])
+            else:
+                raise ValueError(f"Unknown or unavailable opponent profile: {profile}")
+        
+        if all(hand_range is None for hand_range in opponent_ranges):
+            return None
+        return opponent_ranges
+    
+    def _generate_opponent_ranges(
+        self,
+        player_count: int,
+        opponent_profiles: Optional[List[str]] = None,
+        opponent_ranges: Optional[List[Optional[HandRange]]] = None
+    ) -> List[OpponentRange]:
+        """
+        Generate opponent range analysis based on player count, or describe
+        the requested opponent profiles or custom ranges
+        """
+        if opponent_ranges is not None and opponent_profiles is None:
+            return [
+                OpponentRange(
+                    profile="Custom",
+                    range=f"{hand_range.combo_count / COMBO_COUNT * 100:.1f}% of hands",
+                    likely_holdings=hand_range.name.split(",")
+                )
+                for hand_range in opponent_ranges
+            ]
+        if opponent_profiles is not None:
+            profiles_by_name = {profile.name: profile for profile in OPPONENT_PROFILES}
+            profiles = [profiles_by_name[name] for name in opponent_profiles if name in profiles_by_name]
+        else:
+            # Return appropriate number of opponent profiles
+            profiles = OPPONENT_PROFILES[:min(player_count - 1, len(OPPONENT_PROFILES))]
         return [
-            OpponentRange(profile=profile[0], range=profile[1], likely_holdings=profile[2])
-            for profile in profiles[:opponents_needed]
+            OpponentRange(profile=profile.name, range=profile.range_label, likely_holdings=profile.likely_holdings)
+            for profile in profiles
         ]
     
     def _generate_recommendation(self, probabilities: Dict[str, float], hand_strength: HandStrength) -> Recommendation:
@@ -0,0 +1,110 @@
+import logging
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PREFLOP_TABLE_PATH = Path(__file__).parent / "data" / "preflop_equity.bin"
+
+RANK_CHARS = "23456789TJQKA"
+MIN_PLAYERS = 2
+MAX_PLAYERS = 10
+HAND_CLASS_COUNT = 169
+
+
+def hand_class_index(card_ids: Sequence[int]) -> int:
+    """
+    Index (0..168) of the canonical starting hand for two card ids.
+
+    Classes live on a 13x13 rank grid: pairs on the diagonal, suited hands
+    at [high][low] and offsuit hands at [low][high].
+    """
+    high, low = sorted((card_id // 4 for card_id in card_ids), reverse=True)
+    suited = card_ids[0] % 4 == card_ids[1] % 4
+    return high * 13 + low if suited or high == low else low * 13 + high
+
+
+def hand_class_name(index: int) -> str:
+    """Readable name of a hand class, e.g. 'AA', 'AKs', 'T9o'"""
+    row, column = divmod(index, 13)
+    if row == column:
+        return RANK_CHARS[row] * 2
+    if row > column:
+        return f"{RANK_CHARS[row]}{RANK_CHARS[column]}s"
+    return f"{RANK_CHARS[column]}{RANK_CHARS[row]}o"
+
+
+def representative_hand(index: int) -> Sequence[int]:
+    """One concrete pair of card ids belonging to a hand class"""
+    row, column = divmod(index, 13)
+    if row == column:
+        return row * 4, row * 4 + 1
+    if row > column:
+        return row * 4, column * 4
+    return column * 4, row * 4 + 1
+
+
+class PreflopEquityTable:
+    """
+    Precomputed win/tie probabilities for every canonical starting hand
+    against 1 to 9 random opponents.
+
+    Binary layout (little endian): a header of magic, format version, min and
+    max player count, hand class count and simulated deals per entry,
+    followed by float64 [hand class][player_count][win, tie] probabilities.
+    """
+
+    MAGIC = b"PFEQ"
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct("<4sHBBHI")
+
+    def __init__(self, probabilities: np.ndarray, trials: int):
+        self.probabilities = probabilities
+        self.trials = trials
+
+    @classmethod
+    def load(cls, path: Path = PREFLOP_TABLE_PATH) -> "PreflopEquityTable":
+        """Load and validate a table file"""
+        data = Path(path).read_bytes()
+        magic, version, min_players, max_players, classes, trials = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported preflop table {path}: {magic!r} v{version}")
+        if (min_players, max_players, classes) != (MIN_PLAYERS, MAX_PLAYERS, HAND_CLASS_COUNT):
+            raise ValueError(f"Unexpected preflop table dimensions in {path}")
+
+        shape = (HAND_CLASS_COUNT, MAX_PLAYERS - MIN_PLAYERS + 1, 2)
+        probabilities = np.frombuffer(data, dtype="<f8", offset=cls.HEADER.size).reshape(shape)
+        return cls(probabilities, trials)
+
+    @classmethod
+    def load_default(cls) -> Optional["PreflopEquityTable"]:
+        """Load the shipped table, or return None when it is missing or invalid"""
+        try:
+            return cls.load(PREFLOP_TABLE_PATH)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Preflop equity table unavailable, falling back to simulation: {e}")
+            return None
+
+    def save(self, path: Path = PREFLOP_TABLE_PATH):
+        """Write the table in the versioned binary format"""
+        header = self.HEADER.pack(
+            self.MAGIC, self.FORMAT_VERSION, MIN_PLAYERS, MAX_PLAYERS, HAND_CLASS_COUNT, self.trials
+        )
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_bytes(header + self.probabilities.astype("<f8").tobytes())
+
+    def lookup(self, card_ids: Sequence[int], player_count: int) -> Dict[str, float]:
+        """Win/tie/lose percentages for two hole card ids"""
+        win, tie = self.probabilities[hand_class_index(card_ids), player_count - MIN_PLAYERS]
+        return {
+            'win': round(float(win) * 100, 2),
+            'tie': round(float(tie) * 100, 2),
+            'lose': round(float(1 - win - tie) * 100, 2)
+        }
+
+    def confidence(self) -> str:
+        """Worst-case 95% half-width of the stored probabilities"""
+        return f"±{196 * (0.25 / self.trials) ** 0.5:.2f}%"
@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from hand_evaluator import COMBO_COUNT, COMBO_INDEX
+from hand_ranges import COMBO_CLASSES, HandRange
+from preflop_table import RANK_CHARS
+
+SUIT_CHARS = "shdc"  # suit order of card ids (see hand_evaluator)
+SUIT_MARKERS = str.maketrans("SHDCO", "shdco")
+
+# One range item: hand class, optional "+" or "-<hand class>" span, optional ":weight"
+ITEM_PATTERN = re.compile(
+    r"^(?P<hand>[2-9TJQKA]{2}[so]?)"
+    r"(?:(?P<plus>\+)|-(?P<end>[2-9TJQKA]{2}[so]?))?"
+    r"(?::(?P<weight>\d*\.?\d+))?$"
+)
+COMBO_PATTERN = re.compile(r"^(?P<cards>(?:[2-9TJQKA][shdc]){2})(?::(?P<weight>\d*\.?\d+))?$")
+
+
+def normalize_range(notation: str) -> str:
+    """
+    Canonical spelling of a range: upper-case ranks, lower-case suits and
+    s/o markers, "T" for tens, plain weights and single commas between
+    items. Ranges that only differ in spelling share one compiled entry.
+    """
+    items = []
+    for raw_item in re.split(r"[,\s]+", notation.strip()):
+        if not raw_item:
+            continue
+        hand, separator, weight = raw_item.partition(":")
+        # Rank characters never use the letters of suits or of the s/o markers
+        hand = hand.upper().replace("10", "T").translate(SUIT_MARKERS)
+        if separator:
+            try:
+                weight = f"{float(weight):g}"
+            except ValueError:
+                pass
+        items.append(hand + separator + weight)
+    return ",".join(items)
+
+
+def _rank(char: str) -> int:
+    return RANK_CHARS.index(char)
+
+
+def _class_index(high: int, low: int, shape: str) -> int:
+    """Hand class index on the preflop_table 13x13 grid"""
+    if high == low:
+        return high * 13 + high
+    return high * 13 + low if shape == "s" else low * 13 + high
+
+
+def _hand_classes(hand: str) -> List[int]:
+    """Class indexes of a hand class such as 'QQ', 'AKs' or 'AK' (suited and offsuit)"""
+    high, low = sorted((_rank(hand[0]), _rank(hand[1])), reverse=True)
+    if high == low:
+        if len(hand) == 3:
+            raise ValueError(f"Pairs cannot be suited or offsuit: {hand}")
+        return [_class_index(high, low, "")]
+    shapes = [hand[2]] if len(hand) == 3 else ["s", "o"]
+    return [_class_index(high, low, shape) for shape in shapes]
+
+
+def _expand_item(hand: str, plus: bool, end: str) -> List[int]:
+    """Hand classes covered by one range item"""
+    high, low = sorted((_rank(hand[0]), _rank(hand[1])), reverse=True)
+    shape = hand[2:]
+
+    if plus:
+        if high == low:
+            # 77+ = 77, 88, ..., AA
+            return [_class_index(rank, rank, "") for rank in range(high, 13)]
+        # A2s+ = A2s, A3s, ..., AKs
+        return [
+            index for kicker in range(low, high)
+            for index in _hand_classes(RANK_CHARS[high] + RANK_CHARS[kicker] + shape)
+        ]
+
+    if end:
+        end_high, end_low = sorted((_rank(end[0]), _rank(end[1])), reverse=True)
+        if end[2:] != shape:
+            raise ValueError(f"Range ends do not match: {hand}-{end}")
+        if high == low and end_high == end_low:
+            # 22-55
+            first, last = sorted((high, end_high))
+            return [_class_index(rank, rank, "") for rank in range(first, last + 1)]
+        if high == end_high and high not in (low, end_low):
+            # A2s-A5s
+            first, last = sorted((low, end_low))
+            return [
+                index for kicker in range(first, last + 1)
+                for index in _hand_classes(RANK_CHARS[high] + RANK_CHARS[kicker] + shape)
+            ]
+        raise ValueError(f"Unsupported range span: {hand}-{end}")
+
+    return _hand_classes(hand)
+
+
+def _parse_weight(item: str, weight: str) -> float:
+    value = float(weight) if weight else 1.0
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"Range weight must be between 0 and 1: {item}")
+    return value
+
+
+def _compile_items(normalized: str) -> np.ndarray:
+    weights = np.zeros(COMBO_COUNT, dtype=np.float32)
+    for item in normalized.split(","):
+        combo_match = COMBO_PATTERN.match(item)
+        if combo_match:
+            cards = combo_match.group("cards")
+            first = _rank(cards[0]) * 4 + SUIT_CHARS.index(cards[1])
+            second = _rank(cards[2]) * 4 + SUIT_CHARS.index(cards[3])
+            if first == second:
+                raise ValueError(f"Invalid combo: {item}")
+            weights[COMBO_INDEX[first, second]] = _parse_weight(item, combo_match.group("weight"))
+            continue
+
+        match = ITEM_PATTERN.match(item)
+        if match is None:
+            raise ValueError(f"Invalid range item: {item}")
+        classes = _expand_item(match.group("hand"), bool(match.group("plus")), match.group("end"))
+        # Later items override earlier ones, so "AKs, AKs:0.5" ends at half weight
+        weights[np.isin(COMBO_CLASSES, classes)] = _parse_weight(item, match.group("weight"))
+    return weights
+
+
+@lru_cache(maxsize=1024)
+def _compile_normalized(normalized: str) -> HandRange:
+    if not normalized:
+        raise ValueError("Empty range")
+    weights = _compile_items(normalized)
+    if not weights.any():
+        raise ValueError(f"Range has no combos: {normalized}")
+    weights.flags.writeable = False
+    return HandRange(normalized, weights)
+
+
+def compile_range(notation: str) -> HandRange:
+    """
+    Compile standard range notation ("22+, A2s+, KTo+, QJs", "77-99",
+    "A2s-A5s", "AhKh", "AKs:0.5") to a HandRange. Results are memoized by
+    normalized notation and shared, so their weights are read-only.
+    Raises ValueError on malformed notation.
+    """
+    return _compile_normalized(normalize_range(notation))
@@ -1,17 +1,27 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 import os
+import asyncio
+import json
 import logging
 from pathlib import Path
-from models import AnalysisRequest, AnalysisResponse, HandHistory
-from poker_engine import PokerEngine, Card
+from typing import List, Optional, Tuple
+from models import (
+    AnalysisBatchRequest, AnalysisRequest, AnalysisResponse, Card, HandComparisonRequest, HandComparisonResponse,
+    HandHistory, SimulationProgress
+)
+from poker_engine import PokerEngine
+from card_codec import CARD_IDS, cards_mask, check_distinct_cards, encode_cards
 from auth_routes import router as auth_router, get_current_subscribed_user, get_current_user
 from community_routes import router as community_router
 from auth_models import User
 from usage_tracking import UsageTracker
 from permissions_service import PermissionsService
+from engine_executor import EngineExecutor, EngineBusyError, EngineSlot
+from cancellation import AnalysisCancelled, CancellationToken
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -32,7 +42,15 @@ app = FastAPI(
 api_router = APIRouter(prefix="/api")
 
 # Initialize poker engine and services
-poker_engine = PokerEngine()
+# ENGINE_WORKERS > 1 splits large simulations across that many processes
+poker_engine = PokerEngine(parallel_workers=int(os.environ.get('ENGINE_WORKERS', '0')))
+# Engine calls run off the event loop, with bounded concurrency and queueing
+engine_executor = EngineExecutor(
+    max_workers=int(os.environ.get('ENGINE_THREADS', '2')),
+    max_queue=int(os.environ.get('ENGINE_QUEUE_SIZE', '8'))
+)
+# Interval at which a running analysis checks that its client is still connected
+DISCONNECT_POLL_SECONDS = 0.1
 usage_tracker = UsageTracker(db)
 permissions_service = PermissionsService(db)
 
@@ -40,156 +58,550 @@ permissions_service = PermissionsService(db)
 def get_db() -> AsyncIOMotorDatabase:
     return db
 
+async def check_analysis_usage(current_user: User) -> dict:
+    """Charge one analysis to the user, raising 429 once the daily limit is reached"""
+    usage_result = await usage_tracker.check_and_increment_usage(current_user.dict())
+    
+    if not usage_result['can_analyze']:
+        # User has exceeded daily limit
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "limit_reached",
+                "message": "Vous avez atteint votre limite quotidienne de 5 analyses gratuites. Abonnez-vous pour un accès illimité.",
+                "remaining_analyses": usage_result['remaining_analyses'],
+                "reset_time": usage_result.get('reset_time'),
+                "is_premium": usage_result['is_premium']
+            }
+        )
+    
+    # Log the usage for analytics
+    await permissions_service.log_feature_access_attempt(
+        current_user.dict(), 'basic_calculator', True
+    )
+    return usage_result
+
+async def check_custom_ranges_access(request: AnalysisRequest, current_user: User):
+    """Custom opponent ranges are a premium feature (403 otherwise)"""
+    if request.custom_ranges is None:
+        return
+    access_result = await permissions_service.can_use_feature(current_user.dict(), 'custom_ranges')
+    if not access_result['allowed']:
+        upsell = await permissions_service.get_premium_upsell_message('custom_ranges')
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error": "premium_required",
+                "message": upsell['message'],
+                "upsell": upsell
+            }
+        )
+
+def validate_card_format(card) -> bool:
+    """Whether a request card (or None) uses a known rank and suit"""
+    if not card:
+        return True  # None is allowed
+    if not hasattr(card, 'rank') or not hasattr(card, 'suit'):
+        return False
+    return (card.rank, card.suit) in CARD_IDS
+
+def convert_request_cards(request: AnalysisRequest) -> Tuple[List[Card], List[Optional[Card]]]:
+    """Validate the request cards; the engine encodes them itself (see card_codec)"""
+    # Check hole cards format
+    for i, card in enumerate(request.hole_cards):
+        if not validate_card_format(card):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid hole card format at position {i+1}: {card}"
+            )
+    
+    # Check community cards format
+    for i, card in enumerate(request.community_cards):
+        if not validate_card_format(card):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid community card format at position {i+1}: {card}"
+            )
+    
+    hole_cards = [card for card in request.hole_cards if card]
+    community_cards = list(request.community_cards)
+    
+    # Validate hole cards
+    if len(hole_cards) != 2:
+        raise HTTPException(
+            status_code=400, 
+            detail="Exactly 2 hole cards are required"
+        )
+    
+    # Validate community cards count
+    community_count = len([c for c in community_cards if c])
+    if community_count > 5:
+        raise HTTPException(
+            status_code=400, 
+            detail="Maximum 5 community cards allowed"
+        )
+    
+    # Check for duplicate cards
+    try:
+        check_distinct_cards(encode_cards(hole_cards + community_cards))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Duplicate cards detected"
+        )
+    
+    return hole_cards, community_cards
+
+def engine_arguments(request: AnalysisRequest, hole_cards: List[Card], community_cards: List[Optional[Card]]) -> dict:
+    """Keyword arguments of PokerEngine.analyze_hand for a request"""
+    return {
+        'hole_cards': hole_cards,
+        'community_cards': community_cards,
+        'player_count': request.player_count,
+        'simulation_iterations': request.simulation_iterations,
+        'method': request.method,
+        'target_precision': request.target_precision,
+        'sampling': request.sampling,
+        'opponent_profiles': request.opponent_profiles,
+        'custom_ranges': request.custom_ranges,
+        'seed': request.seed,
+        'max_latency_ms': request.max_latency_ms,
+        'time_budget_ms': request.time_budget_ms
+    }
+
+def build_analysis_response(result, usage_result: dict) -> dict:
+    """Convert an engine result to the response format with usage info"""
+    return {
+        'win_probability': result.win_probability,
+        'tie_probability': result.tie_probability,
+        'lose_probability': result.lose_probability,
+        'hand_strength': result.hand_strength.__dict__,
+        'opponent_ranges': [range.__dict__ for range in result.opponent_ranges],
+        'recommendation': result.recommendation.__dict__,
+        'calculations': result.calculations.__dict__,
+        'usage_info': {
+            'remaining_analyses': usage_result['remaining_analyses'],
+            'is_premium': usage_result['is_premium'],
+            'daily_limit': UsageTracker.FREE_DAILY_LIMIT if not usage_result['is_premium'] else None
+        }
+    }
+
+def build_hand_history(request: AnalysisRequest, result, user_id: str) -> HandHistory:
+    response_for_storage = AnalysisResponse(
+        win_probability=result.win_probability,
+        tie_probability=result.tie_probability,
+        lose_probability=result.lose_probability,
+        hand_strength=result.hand_strength.__dict__,
+        opponent_ranges=[range.__dict__ for range in result.opponent_ranges],
+        recommendation=result.recommendation.__dict__,
+        calculations=result.calculations.__dict__
+    )
+    return HandHistory(
+        analysis_request=request,
+        analysis_response=response_for_storage,
+        user_id=user_id,
+        spot_key=result.spot_key,
+        card_mask=int(cards_mask(encode_cards(request.hole_cards + request.community_cards)))
+    )
+
+async def store_hand_history(request: AnalysisRequest, result, user_id: str):
+    """Store an analysis in the hand history (optional, failures are only logged)"""
+    try:
+        await db.hand_history.insert_one(build_hand_history(request, result, user_id).dict())
+    except Exception as e:
+        logging.warning(f"Failed to save hand history: {e}")
+
+def engine_busy_exception(e: EngineBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error": "engine_busy",
+            "message": "Le moteur d'analyse est saturé. Veuillez réessayer dans quelques instants.",
+            "retry_after": e.retry_after_seconds
+        },
+        headers={"Retry-After": str(e.retry_after_seconds)}
+    )
+
+def analysis_cancelled_exception() -> HTTPException:
+    # 499 (client closed request): nobody reads it, but it keeps access logs explicit
+    return HTTPException(
+        status_code=499,
+        detail={
+            "error": "analysis_cancelled",
+            "message": "L'analyse a été annulée car la connexion a été fermée."
+        }
+    )
+
+async def run_until_disconnected(http_request: Request, slot: EngineSlot, func, **kwargs):
+    """
+    Run an engine call in a reserved engine slot, cancelling it (AnalysisCancelled)
+    as soon as the HTTP client disconnects or the handler itself is cancelled
+    """
+    cancel_token = CancellationToken()
+    analysis = slot.start(func, cancel_token=cancel_token, **kwargs)
+    try:
+        while True:
+            done, _ = await asyncio.wait({analysis}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return analysis.result()
+            if await http_request.is_disconnected():
+                cancel_token.cancel()
+                # The engine stops at its next chunk and frees its slot
+                return await analysis
+    finally:
+        cancel_token.cancel()
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @api_router.post("/analyze-hand")
 async def analyze_hand(
     request: AnalysisRequest,
+    http_request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Analyze a poker hand and return win probabilities, hand strength, and strategic recommendations.
     
-    Now includes usage tracking for free users with daily limits.
+    Now includes usage tracking for free users with daily limits. The
+    simulation is cancelled if the client disconnects before it finishes.
     """
+    try:
+        # Hold an engine slot before charging usage, so a charged analysis always runs
+        slot = engine_executor.reserve()
+    except EngineBusyError as e:
+        raise engine_busy_exception(e)
+    
     try:
         # Check permissions and usage limits
-        usage_result = await usage_tracker.check_and_increment_usage(current_user.dict())
+        await check_custom_ranges_access(request, current_user)
+        usage_result = await check_analysis_usage(current_user)
+        
+        hole_cards, community_cards = convert_request_cards(request)
         
-        if not usage_result['can_analyze']:
-            # User has exceeded daily limit
+        # Perform analysis on the engine pool so the event loop stays responsive
+        try:
+            result = await run_until_disconnected(
+                http_request,
+                slot,
+                poker_engine.analyze_hand,
+                **engine_arguments(request, hole_cards, community_cards)
+            )
+        except AnalysisCancelled:
+            logging.info("Analysis cancelled: client disconnected")
+            raise analysis_cancelled_exception()
+        except ValueError as e:
             raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": "limit_reached",
-                    "message": "Vous avez atteint votre limite quotidienne de 5 analyses gratuites. Abonnez-vous pour un accès illimité.",
-                    "remaining_analyses": usage_result['remaining_analyses'],
-                    "reset_time": usage_result.get('reset_time'),
-                    "is_premium": usage_result['is_premium']
-                }
+                status_code=400,
+                detail=str(e)
             )
         
-        # Log the usage for analytics
+        response_dict = build_analysis_response(result, usage_result)
+        await store_hand_history(request, result, current_user.id)
+        return response_dict
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error analyzing hand: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error during analysis: {str(e)}"
+        )
+    finally:
+        slot.release()
+
+@api_router.post("/analyze-hand/stream")
+async def analyze_hand_stream(
+    request: AnalysisRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streaming variant of /analyze-hand (Server-Sent Events).
+    
+    Emits `progress` events with running win/tie/lose estimates and their
+    confidence interval while the Monte Carlo simulation runs, then one
+    `result` event holding the full analysis response. Failures after the
+    stream has started are reported as an `error` event. Closing the
+    stream cancels the simulation.
+    """
+    try:
+        slot = engine_executor.reserve()
+    except EngineBusyError as e:
+        raise engine_busy_exception(e)
+    try:
+        await check_custom_ranges_access(request, current_user)
+        usage_result = await check_analysis_usage(current_user)
+        hole_cards, community_cards = convert_request_cards(request)
+    except BaseException:
+        slot.release()
+        raise
+    
+    loop = asyncio.get_running_loop()
+    progress_queue: asyncio.Queue = asyncio.Queue()
+    
+    def on_progress(progress):
+        # Called from the engine thread
+        loop.call_soon_threadsafe(progress_queue.put_nowait, progress)
+    
+    cancel_token = CancellationToken()
+    analysis = slot.start(
+        poker_engine.analyze_hand,
+        on_progress=on_progress,
+        cancel_token=cancel_token,
+        **engine_arguments(request, hole_cards, community_cards)
+    )
+    # Progress callbacks are queued before completion, so None always comes last
+    analysis.add_done_callback(lambda _: progress_queue.put_nowait(None))
+    
+    async def event_stream():
+        try:
+            while True:
+                progress = await progress_queue.get()
+                if progress is None:
+                    break
+                yield sse_event("progress", SimulationProgress(**progress.__dict__).dict())
+        finally:
+            # The client went away mid-stream: stop the engine at its next chunk
+            if not analysis.done():
+                cancel_token.cancel()
+                analysis.add_done_callback(lambda future: future.cancelled() or future.exception())
+        
+        try:
+            result = analysis.result()
+        except ValueError as e:
+            yield sse_event("error", {"error": "invalid_request", "message": str(e)})
+            return
+        except Exception as e:
+            logging.error(f"Error analyzing hand: {e}")
+            yield sse_event("error", {"error": "internal_error", "message": f"Internal server error during analysis: {str(e)}"})
+            return
+        
+        yield sse_event("result", build_analysis_response(result, usage_result))
+        await store_hand_history(request, result, current_user.id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.post("/analyze-batch")
+async def analyze_batch(
+    batch: AnalysisBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze a list of spots in one engine job (Server-Sent Events).
+    
+    Items with the same spot and settings are computed once (see
+    PokerEngine.analyze_batch). Items are validated before usage is charged,
+    per valid item in a single write; items that still fail in the engine
+    are refunded. Hand histories are stored with one bulk insert. One
+    `result` or `error` event is emitted per item, in request order,
+    followed by a `done` summary event.
+    """
+    try:
+        # Hold an engine slot before charging usage, so the charged items always run
+        slot = engine_executor.reserve()
+    except EngineBusyError as e:
+        raise engine_busy_exception(e)
+    try:
+        return await start_batch(batch, current_user, slot)
+    finally:
+        slot.release()
+
+async def start_batch(batch: AnalysisBatchRequest, current_user: User, slot: EngineSlot) -> StreamingResponse:
+    """Validate and charge the items of a batch, then stream its analysis from the reserved slot"""
+    # Invalid items only reject themselves
+    item_errors = {}
+    valid_indexes = []
+    engine_items = []
+    for index, request in enumerate(batch.items):
+        try:
+            await check_custom_ranges_access(request, current_user)
+            hole_cards, community_cards = convert_request_cards(request)
+            arguments = engine_arguments(request, hole_cards, community_cards)
+            poker_engine.check_batch_item(arguments)
+        except HTTPException as e:
+            item_errors[index] = e.detail if isinstance(e.detail, dict) else {"error": "invalid_request", "message": e.detail}
+            continue
+        except ValueError as e:
+            item_errors[index] = {"error": "invalid_request", "message": str(e)}
+            continue
+        valid_indexes.append(index)
+        engine_items.append(arguments)
+    
+    usage_result = await usage_tracker.check_and_increment_usage_batch(current_user.dict(), len(engine_items))
+    if engine_items and not usage_result['can_analyze']:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "limit_reached",
+                "message": "Vous avez atteint votre limite quotidienne de 5 analyses gratuites. Abonnez-vous pour un accès illimité.",
+                "remaining_analyses": usage_result['remaining_analyses'],
+                "reset_time": usage_result.get('reset_time'),
+                "is_premium": usage_result['is_premium']
+            }
+        )
+    
+    # Free users only get what is left of their daily limit
+    granted = usage_result['granted_analyses']
+    for index in valid_indexes[granted:]:
+        item_errors[index] = {
+            "error": "limit_reached",
+            "message": "Limite quotidienne atteinte pour cette analyse. Abonnez-vous pour un accès illimité."
+        }
+    valid_indexes = valid_indexes[:granted]
+    engine_items = engine_items[:granted]
+    
+    if engine_items:
         await permissions_service.log_feature_access_attempt(
             current_user.dict(), 'basic_calculator', True
         )
+    
+    loop = asyncio.get_running_loop()
+    result_queue: asyncio.Queue = asyncio.Queue()
+    
+    def on_result(position, outcome):
+        # Called from the engine thread
+        loop.call_soon_threadsafe(result_queue.put_nowait, (valid_indexes[position], outcome))
+    
+    analysis = slot.start(poker_engine.analyze_batch, engine_items, on_result=on_result)
+    analysis.add_done_callback(lambda _: result_queue.put_nowait(None))
+    
+    async def event_stream():
+        histories = []
+        cached = 0
+        next_index = 0
         
-        # Validate card formats before conversion
-        def validate_card_format(card):
-            if not card:
-                return True  # None is allowed
-            if not hasattr(card, 'rank') or not hasattr(card, 'suit'):
-                return False
-            valid_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-            valid_suits = ['hearts', 'diamonds', 'clubs', 'spades']
-            return card.rank in valid_ranks and card.suit in valid_suits
-        
-        # Check hole cards format
-        for i, card in enumerate(request.hole_cards):
-            if not validate_card_format(card):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid hole card format at position {i+1}: {card}"
-                )
+        def pending_errors():
+            # Rejected items preceding the next engine result, kept in request order
+            nonlocal next_index
+            events = []
+            while next_index in item_errors:
+                events.append(sse_event("error", dict(item_errors[next_index], index=next_index)))
+                next_index += 1
+            return events
         
-        # Check community cards format
-        for i, card in enumerate(request.community_cards):
-            if not validate_card_format(card):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid community card format at position {i+1}: {card}"
-                )
+        while True:
+            for event in pending_errors():
+                yield event
+            outcome = await result_queue.get()
+            if outcome is None:
+                break
+            index, result = outcome
+            next_index = index + 1
+            if isinstance(result, ValueError):
+                yield sse_event("error", {"index": index, "error": "invalid_request", "message": str(result)})
+                continue
+            cached += result.calculations.cached
+            yield sse_event("result", dict(build_analysis_response(result, usage_result), index=index))
+            histories.append(build_hand_history(batch.items[index], result, current_user.id).dict())
         
-        # Convert request cards to engine format
         try:
-            hole_cards = [Card(rank=card.rank, suit=card.suit) for card in request.hole_cards if card]
-            community_cards = [
-                Card(rank=card.rank, suit=card.suit) if card else None 
-                for card in request.community_cards
-            ]
+            analysis.result()
         except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Error converting card format: {str(e)}"
-            )
+            # The engine stopped early: every item it did not report fails with it
+            logging.error(f"Error analyzing batch: {e}")
+            for index in valid_indexes:
+                if index >= next_index:
+                    item_errors[index] = {
+                        "error": "internal_error",
+                        "message": f"Internal server error during analysis: {str(e)}"
+                    }
         
-        # Validate hole cards
-        if len(hole_cards) != 2:
-            raise HTTPException(
-                status_code=400, 
-                detail="Exactly 2 hole cards are required"
-            )
+        for index in sorted(index for index in item_errors if index >= next_index):
+            yield sse_event("error", dict(item_errors[index], index=index))
         
-        # Validate community cards count
-        community_count = len([c for c in community_cards if c])
-        if community_count > 5:
-            raise HTTPException(
-                status_code=400, 
-                detail="Maximum 5 community cards allowed"
-            )
+        # Charged items without a result (engine errors) are given back
+        await usage_tracker.refund_usage(current_user.dict(), len(valid_indexes) - len(histories))
         
-        # Check for duplicate cards
-        all_cards = hole_cards + [c for c in community_cards if c]
-        card_strings = [f"{c.rank}_{c.suit}" for c in all_cards]
-        if len(card_strings) != len(set(card_strings)):
-            raise HTTPException(
-                status_code=400,
-                detail="Duplicate cards detected"
-            )
+        if histories:
+            try:
+                await db.hand_history.insert_many(histories, ordered=False)
+            except Exception as e:
+                logging.warning(f"Failed to save hand history: {e}")
         
-        # Perform analysis
-        result = poker_engine.analyze_hand(
-            hole_cards=hole_cards,
-            community_cards=community_cards,
-            player_count=request.player_count,
-            simulation_iterations=request.simulation_iterations
+        yield sse_event("done", {
+            "items": len(batch.items),
+            "analyzed": len(histories),
+            "cached": cached,
+            "rejected": len(batch.items) - len(histories)
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.post("/compare-hands", response_model=HandComparisonResponse)
+async def compare_hands(
+    request: HandComparisonRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Equity of every seat of a hand (hand comparator - Premium feature).
+    
+    Seats hold known hole cards or null for a random hand; split pots are
+    shared fractionally between the tied seats.
+    """
+    access_result = await permissions_service.can_use_feature(current_user.dict(), 'hand_comparator')
+    if not access_result['allowed']:
+        upsell = await permissions_service.get_premium_upsell_message('hand_comparator')
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error": "premium_required",
+                "message": upsell['message'],
+                "upsell": upsell
+            }
         )
+    
+    try:
+        slot = engine_executor.reserve()
+    except EngineBusyError as e:
+        raise engine_busy_exception(e)
+    
+    try:
+        await check_analysis_usage(current_user)
         
-        # Convert to response format with usage info
-        response_dict = {
-            'win_probability': result.win_probability,
-            'tie_probability': result.tie_probability,
-            'lose_probability': result.lose_probability,
-            'hand_strength': result.hand_strength.__dict__,
-            'opponent_ranges': [range.__dict__ for range in result.opponent_ranges],
-            'recommendation': result.recommendation.__dict__,
-            'calculations': result.calculations.__dict__,
-            'usage_info': {
-                'remaining_analyses': usage_result['remaining_analyses'],
-                'is_premium': usage_result['is_premium'],
-                'daily_limit': UsageTracker.FREE_DAILY_LIMIT if not usage_result['is_premium'] else None
-            }
-        }
+        cards = [card for seat in request.seats if seat for card in seat] + list(request.community_cards)
+        for card in cards:
+            if not validate_card_format(card):
+                raise HTTPException(status_code=400, detail=f"Invalid card format: {card}")
+        if len([card for card in request.community_cards if card]) > 5:
+            raise HTTPException(status_code=400, detail="Maximum 5 community cards allowed")
         
-        # Store in database (optional) - create response object for storage
         try:
-            response_for_storage = AnalysisResponse(
-                win_probability=result.win_probability,
-                tie_probability=result.tie_probability,
-                lose_probability=result.lose_probability,
-                hand_strength=result.hand_strength.__dict__,
-                opponent_ranges=[range.__dict__ for range in result.opponent_ranges],
-                recommendation=result.recommendation.__dict__,
-                calculations=result.calculations.__dict__
-            )
-            hand_history = HandHistory(
-                analysis_request=request,
-                analysis_response=response_for_storage,
-                user_id=current_user.id
+            result = await slot.start(
+                poker_engine.analyze_seats,
+                seats=[seat or None for seat in request.seats],
+                community_cards=request.community_cards,
+                simulation_iterations=request.simulation_iterations,
+                seed=request.seed
             )
-            await db.hand_history.insert_one(hand_history.dict())
-        except Exception as e:
-            logging.warning(f"Failed to save hand history: {e}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return response_dict
+        return {
+            'seats': [seat.__dict__ for seat in result.seats],
+            'calculations': result.calculations.__dict__
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error analyzing hand: {e}")
+        logging.error(f"Error comparing hands: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error during analysis: {str(e)}"
         )
+    finally:
+        slot.release()
 
 @api_router.get("/usage-stats")
 async def get_user_usage_stats(
@@ -328,7 +740,9 @@ async def health_check():
     return {
         "status": "healthy",
         "engine": "operational",
-        "database": "connected" if client else "disconnected"
+        "database": "connected" if client else "disconnected",
+        "equity_cache": poker_engine.equity_cache.stats(),
+        "engine_executor": engine_executor.stats()
     }
 
 # Include the router in the main app
@@ -357,6 +771,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_hand_history_indexes():
+    # Hand history is looked up by canonical spot, same key as the engine caches
+    try:
+        await db.hand_history.create_index("spot_key")
+    except Exception as e:
+        logger.warning(f"Failed to create hand history indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def shutdown_engine():
+    engine_executor.shutdown()
+    poker_engine.shutdown()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import itertools
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+# Card ids are rank * 4 + suit (see hand_evaluator). A suit relabelling maps
+# every card id to the same rank with a permuted suit.
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+PERMUTED_CARD_IDS = [
+    [card_id - card_id % 4 + permutation[card_id % 4] for card_id in range(52)]
+    for permutation in SUIT_PERMUTATIONS
+]
+
+# 64-bit key layout, most significant first:
+# player_count (4 bits) | board length (3 bits) | 2 hole cards | 5 board slots,
+# 6 bits per card slot holding card_id + 1 (0 marks an empty board slot)
+CARD_BITS = 6
+BOARD_SLOTS = 5
+
+
+@dataclass(frozen=True)
+class CanonicalSpot:
+    """
+    Representative of a spot up to suit relabelling. Hole and board cards
+    are sorted card ids, so card order within the hand or board is irrelevant
+    too; two spots are equivalent exactly when their keys are equal.
+    """
+    hole_cards: Tuple[int, ...]
+    board_cards: Tuple[int, ...]
+    player_count: int
+
+    @property
+    def key(self) -> int:
+        """Stable 64-bit integer encoding shared by caches, tables and history"""
+        key = (self.player_count << 3) | len(self.board_cards)
+        slots = list(self.hole_cards) + list(self.board_cards)
+        slots += [-1] * (2 + BOARD_SLOTS - len(slots))
+        for card_id in slots:
+            key = (key << CARD_BITS) | (card_id + 1)
+        return key
+
+    @classmethod
+    def from_key(cls, key: int) -> "CanonicalSpot":
+        """Decode a key produced by CanonicalSpot.key"""
+        slots = []
+        for _ in range(2 + BOARD_SLOTS):
+            slots.append((key & ((1 << CARD_BITS) - 1)) - 1)
+            key >>= CARD_BITS
+        slots.reverse()
+        board_length = key & 0b111
+        return cls(
+            hole_cards=tuple(slots[:2]),
+            board_cards=tuple(slots[2:2 + board_length]),
+            player_count=key >> 3
+        )
+
+    @property
+    def street(self) -> str:
+        return {0: "preflop", 3: "flop", 4: "turn", 5: "river"}.get(len(self.board_cards), "partial")
+
+
+def canonicalize_spot(
+    hole_cards: Sequence[int],
+    community_cards: Sequence[Optional[int]],
+    player_count: int
+) -> CanonicalSpot:
+    """
+    Map a spot given as card ids to its canonical representative.
+
+    community_cards may contain None entries for cards not dealt yet (as in
+    analysis requests); only the known cards take part. The representative
+    is the lexicographically smallest (hole, board) pair over all 24 suit
+    relabellings.
+    """
+    board = [card_id for card_id in community_cards if card_id is not None]
+    best = None
+    for permuted in PERMUTED_CARD_IDS:
+        candidate = (
+            tuple(sorted(permuted[card_id] for card_id in hole_cards)),
+            tuple(sorted(permuted[card_id] for card_id in board))
+        )
+        if best is None or candidate < best:
+            best = candidate
+    return CanonicalSpot(hole_cards=best[0], board_cards=best[1], player_count=player_count)
@@ -98,53 +98,53 @@ class UsageTracker:
             'reset_time': str (if limit reached)
         }
         """
+        return await self.check_and_increment_usage_batch(user, 1)
+    
+    async def check_and_increment_usage_batch(self, user: Dict[str, Any], requested: int) -> Dict[str, Any]:
+        """
+        Charge up to `requested` analyses at once with a single usage write.
+        Free users are granted what is left of their daily limit; the result
+        is shaped like check_and_increment_usage plus 'granted_analyses'.
+        """
         user_id = user.get('id')
         is_premium = await self.is_premium_user(user)
         today = await self.get_today_string()
         
+        usage = await self.get_user_daily_usage(user_id)
+        # Reset counter if it's a new day
+        current_count = usage.analysis_count if usage and usage.last_analysis_date == today else 0
+        
         # Premium users have unlimited access
         if is_premium:
             # Still track usage for premium users (for analytics)
-            usage = await self.get_user_daily_usage(user_id)
-            if usage and usage.last_analysis_date == today:
-                await self.create_or_update_usage(user_id, usage.analysis_count + 1)
-            else:
-                await self.create_or_update_usage(user_id, 1)
-            
+            await self.create_or_update_usage(user_id, current_count + requested)
             return {
                 'can_analyze': True,
                 'remaining_analyses': -1,  # -1 indicates unlimited
                 'is_premium': True,
                 'limit_reached': False,
                 'reset_time': None,
-                'current_count': 0
+                'current_count': 0,
+                'granted_analyses': requested
             }
         
-        # Get current usage
-        usage = await self.get_user_daily_usage(user_id)
-        current_count = 0
+        granted = min(requested, max(0, self.FREE_DAILY_LIMIT - current_count))
         
-        # Reset counter if it's a new day
-        if not usage or usage.last_analysis_date != today:
-            current_count = 1
-            await self.create_or_update_usage(user_id, current_count)
-        else:
-            current_count = usage.analysis_count
-            
-            # Check if limit reached
-            if current_count >= self.FREE_DAILY_LIMIT:
-                return {
-                    'can_analyze': False,
-                    'remaining_analyses': 0,
-                    'is_premium': False,
-                    'limit_reached': True,
-                    'reset_time': self._get_next_reset_time(),
-                    'current_count': current_count
-                }
-            
-            # Increment counter
-            current_count += 1
-            await self.create_or_update_usage(user_id, current_count)
+        # Check if limit reached
+        if granted == 0:
+            return {
+                'can_analyze': False,
+                'remaining_analyses': 0,
+                'is_premium': False,
+                'limit_reached': True,
+                'reset_time': self._get_next_reset_time(),
+                'current_count': current_count,
+                'granted_analyses': 0
+            }
+        
+        # Increment counter
+        current_count += granted
+        await self.create_or_update_usage(user_id, current_count)
         
         remaining = max(0, self.FREE_DAILY_LIMIT - current_count)
         
@@ -154,9 +154,27 @@ class UsageTracker:
             'is_premium': False,
             'limit_reached': False,
             'reset_time': None,
-            'current_count': current_count
+            'current_count': current_count,
+            'granted_analyses': granted
         }
     
+    async def refund_usage(self, user: Dict[str, Any], count: int):
+        """Give back `count` analyses charged today that never produced a result"""
+        if count <= 0:
+            return
+        user_id = user.get('id')
+        today = await self.get_today_string()
+        try:
+            await self.collection.update_one(
+                {"user_id": user_id, "last_analysis_date": today, "analysis_count": {"$gte": count}},
+                {
+                    "$inc": {"analysis_count": -count},
+                    "$set": {"updated_at": datetime.utcnow()}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error refunding usage for user {user_id}: {e}")
+    
     async def get_usage_stats(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """Get current usage statistics without incrementing"""
         user_id = user.get('id')
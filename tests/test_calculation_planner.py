@@ -0,0 +1,48 @@
+from calculation_planner import CalculationPlanner
+from poker_engine import PokerEngine
+
+
+def test_most_accurate_method_within_budget_is_chosen():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    # Heads-up flop: exact enumeration fits a generous budget
+    assert planner.choose(planner.estimates(3, 2, 100000, 1000), 1000).strategy == "exact"
+    # A tight budget falls back to fewer simulated deals
+    plan = planner.choose(planner.estimates(3, 6, 100000, 20), 20)
+    assert plan.strategy in ("hybrid", "monte_carlo")
+    assert plan.estimated_ms <= 20
+    assert plan.iterations < 100000
+
+
+def test_fastest_method_when_nothing_fits():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    estimates = planner.estimates(3, 10, 100000, 0.01)
+    plan = planner.choose(estimates, 0.01)
+    assert plan.estimated_ms == min(estimate.estimated_ms for estimate in estimates)
+    assert plan.iterations is None or plan.iterations >= CalculationPlanner.MIN_ITERATIONS
+
+
+def test_ranged_opponents_are_only_simulated():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    estimates = planner.estimates(3, 2, 100000, 1000, ranged_opponents=1)
+    assert [estimate.strategy for estimate in estimates] == ["monte_carlo"]
+
+
+def test_measured_throughput_updates_estimates():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    before = planner.estimates(3, 2, 100000)[0].estimated_ms
+    work = planner.evaluations("exact", 3, 2)
+    planner.record("exact", work, 10 * before)
+    assert planner.estimates(3, 2, 100000)[0].estimated_ms > before
+
+
+def test_analytic_error_grows_with_players():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    assert planner.choose(planner.estimates(3, 6, 100000, 1000), 1000).strategy == "analytic"
+    # At 10 players the model error exceeds the error of 100k hybrid deals
+    assert planner.choose(planner.estimates(3, 10, 100000, 1000), 1000).strategy == "hybrid"
+
+
+def test_precise_cached_result_is_reused():
+    planner = CalculationPlanner(PokerEngine.ANALYTIC_MODEL_ERROR)
+    assert planner.choose(planner.estimates(3, 6, 100000, 1000, cached_error=0.1), 1000).strategy == "cache"
+    assert planner.choose(planner.estimates(3, 6, 100000, 1000, cached_error=0.8), 1000).strategy != "cache"
@@ -0,0 +1,29 @@
+import pytest
+from treys import Card as TreysCard
+
+from card_codec import CARD_IDS, card_id, card_label, cards_mask, check_distinct_cards, encode_card, remaining_cards
+from poker_engine import Card
+
+
+def test_request_cards_map_to_card_ids():
+    assert len(CARD_IDS) == 52
+    assert sorted(CARD_IDS.values()) == list(range(52))
+    assert card_label(card_id('A', 'hearts')) == TreysCard.int_to_pretty_str(TreysCard.new('Ah'))
+    assert card_label(card_id('10', 'clubs')) == TreysCard.int_to_pretty_str(TreysCard.new('Tc'))
+    assert encode_card(Card(rank='T', suit='spades')) == card_id('10', 'spades')
+
+
+def test_unknown_cards_are_rejected():
+    assert card_id('1', 'hearts') is None
+    assert card_id('A', 'stars') is None
+    with pytest.raises(ValueError):
+        encode_card(Card(rank='A', suit='h'))
+
+
+def test_duplicates_are_rejected_and_masks_remove_dead_cards():
+    check_distinct_cards([0, 5, 51])
+    with pytest.raises(ValueError, match="Duplicate"):
+        check_distinct_cards([3, 17, 3])
+    assert int(cards_mask([0, 5, 51])) == (1 << 0) | (1 << 5) | (1 << 51)
+    remaining = remaining_cards(cards_mask([0, 5, 51]))
+    assert remaining.tolist() == [card for card in range(52) if card not in (0, 5, 51)]
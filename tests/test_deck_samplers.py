@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from deck_samplers import DECK_SAMPLERS, DeckSampler
+
+
+@pytest.mark.parametrize("name", sorted(DECK_SAMPLERS))
+def test_samplers_deal_distinct_uniform_cards(name):
+    remaining_deck = np.arange(3, 52)
+    sampler = DECK_SAMPLERS[name](remaining_deck, 20000)
+    sampler.reset(20000, np.random.default_rng(5))
+    rows = np.arange(20000)
+    first = sampler.deal(rows, 3)
+    # Later deals may skip rows; the cards they get are still new to each row
+    second = sampler.deal(rows[::2], 4)
+    hands = np.concatenate([first[::2], second], axis=1)
+    assert np.isin(hands, remaining_deck).all()
+    assert all(len(set(hand)) == 7 for hand in hands.tolist())
+    frequencies = np.bincount(second.ravel(), minlength=52)[3:] / second.size
+    assert frequencies == pytest.approx(1 / 49, abs=0.004)
+
+
+def test_samplers_must_implement_deal():
+    with pytest.raises(TypeError):
+        DeckSampler(np.arange(52), 10)
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from cancellation import AnalysisCancelled
+from engine_executor import EngineBusyError, EngineExecutor
+
+
+def test_rejects_beyond_capacity_and_recovers():
+    executor = EngineExecutor(max_workers=1, max_queue=1, retry_after_seconds=3)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(gate.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(EngineBusyError) as busy:
+            await executor.run(lambda: "rejected")
+        assert busy.value.retry_after_seconds == 3
+        with pytest.raises(EngineBusyError):
+            executor.check_capacity()
+
+        # The event loop stays free while the engine thread is blocked
+        assert await asyncio.wait_for(asyncio.sleep(0, result="loop alive"), 1) == "loop alive"
+
+        gate.set()
+        assert await running is True
+        assert await queued == "queued"
+        assert await executor.run(lambda: 42) == 42
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert stats == {
+        "in_flight": 0, "capacity": 2, "completed": 3, "rejected": 2, "cancelled": 0, "cancelled_work_saved": 0.0
+    }
+    executor.shutdown()
+
+
+def test_cancelled_calls_are_counted_with_the_work_saved():
+    executor = EngineExecutor(max_workers=1, max_queue=0)
+
+    def cancelled_at_quarter():
+        raise AnalysisCancelled(0.25)
+
+    async def scenario():
+        with pytest.raises(AnalysisCancelled):
+            await executor.run(cancelled_at_quarter)
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert stats["in_flight"] == 0
+    assert stats["cancelled"] == 1 and stats["completed"] == 0
+    assert stats["cancelled_work_saved"] == 0.75
+    executor.shutdown()
+
+
+def test_reserved_slots_count_until_started_or_released():
+    executor = EngineExecutor(max_workers=1, max_queue=1)
+
+    async def scenario():
+        first = executor.reserve()
+        second = executor.reserve()
+        # Both slots are held: nothing else is admitted, not even a run()
+        with pytest.raises(EngineBusyError):
+            await executor.run(lambda: "rejected")
+        assert await first.start(lambda: "reserved") == "reserved"
+        # Releasing a started slot is a no-op; releasing an unused one frees it
+        first.release()
+        assert executor.stats()["in_flight"] == 1
+        second.release()
+        second.release()
+        assert executor.stats()["in_flight"] == 0
+        with pytest.raises(RuntimeError):
+            second.start(lambda: "too late")
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert stats["completed"] == 1 and stats["rejected"] == 1
+    executor.shutdown()
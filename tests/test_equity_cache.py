@@ -0,0 +1,59 @@
+from equity_cache import CachedEquity, EquityCache
+
+
+def entry(iterations, win=50.0):
+    return CachedEquity(
+        probabilities={'win': win, 'tie': 1.0, 'lose': 99.0 - win},
+        method="Monte Carlo",
+        confidence="±0.8%",
+        simulation_time_ms=120,
+        iterations=iterations
+    )
+
+
+def test_precision_aware_reuse():
+    cache = EquityCache()
+    cache.put(1, entry(100000))
+    assert cache.get(1, 50000) is not None
+    assert cache.get(1, 100000) is not None
+    assert cache.get(1, 200000) is None
+    # Exact requests are only served by exact results
+    assert cache.get(1, None) is None
+
+    cache.put(1, entry(None))
+    assert cache.get(1, None) is not None
+    assert cache.get(1, 500000) is not None
+    assert cache.stats()["hits"] == 4
+    assert cache.stats()["misses"] == 2
+
+
+def test_less_precise_result_does_not_replace_cached_one():
+    cache = EquityCache()
+    cache.put(1, entry(200000, win=40.0))
+    cache.put(1, entry(10000, win=45.0))
+    assert cache.get(1, 10000).probabilities['win'] == 40.0
+
+
+def test_evicts_least_recently_used_within_memory_bound():
+    size = entry(1000).size_bytes()
+    cache = EquityCache(max_bytes=3 * size)
+    for key in range(3):
+        cache.put(key, entry(1000))
+    cache.get(0, 1000)
+    cache.put(3, entry(1000))
+
+    assert cache.get(1, 1000) is None
+    assert all(cache.get(key, 1000) is not None for key in (0, 2, 3))
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["memory_bytes"] <= stats["max_bytes"]
+
+
+def test_target_precision_served_by_tight_enough_interval():
+    cache = EquityCache()
+    cached = entry(30000)
+    cached.half_width = 0.4
+    cache.put(1, cached)
+    assert cache.get(1, 500000, target_precision=0.5) is not None
+    assert cache.get(1, 500000, target_precision=0.3) is None
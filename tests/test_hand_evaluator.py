@@ -0,0 +1,119 @@
+"""
+Correctness suite for the lookup-table evaluator against treys.
+
+Every entry of both lookup tables is checked: all 49,205 non-flush 7-card
+rank multisets and all 4,719 suited rank masks of 5 to 7 cards. On top of
+that every 7-card hand of the A-5 sub-deck (wheel straights, flushes,
+straight flushes, quads and boats in all suit layouts) and a random sample
+of full-deck hands are compared hand by hand.
+"""
+import itertools
+
+import numpy as np
+import pytest
+from treys import Evaluator
+
+from hand_evaluator import COMBO_CARDS, COMBO_INDEX, COMBO_MASKS, DEAD_SCORE, TREYS_CARDS, BoardTables, LookupEvaluator
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return LookupEvaluator()
+
+
+@pytest.fixture(scope="module")
+def treys_evaluator():
+    return Evaluator()
+
+
+def assert_matches_treys(evaluator, treys_evaluator, hands):
+    hands = np.array(hands)
+    scores = evaluator.evaluate_batch(hands)
+    for hand, score in zip(hands.tolist(), scores.tolist()):
+        cards = [TREYS_CARDS[card_id] for card_id in hand]
+        expected = treys_evaluator.evaluate(cards[:2], cards[2:])
+        assert score == expected, [TREYS_CARDS[card_id] for card_id in hand]
+        assert evaluator.get_rank_class(score) == treys_evaluator.get_rank_class(expected)
+
+
+def test_every_non_flush_rank_multiset(evaluator, treys_evaluator):
+    hands = []
+    for ranks in itertools.combinations_with_replacement(range(13), 7):
+        if max(ranks.count(rank) for rank in ranks) > 4:
+            continue
+        # Cycling suits over the sorted ranks never puts 5 cards in one suit
+        hands.append([rank * 4 + position % 4 for position, rank in enumerate(ranks)])
+    assert len(hands) == 49205
+    assert_matches_treys(evaluator, treys_evaluator, hands)
+
+
+def test_every_flush_rank_mask(evaluator, treys_evaluator):
+    hands = []
+    for size in (5, 6, 7):
+        for suited in itertools.combinations(range(13), size):
+            fillers = [rank * 4 + 1 + rank % 3 for rank in range(7 - size)]
+            hands.append([rank * 4 for rank in suited] + fillers)
+    assert len(hands) == 4719
+    assert_matches_treys(evaluator, treys_evaluator, hands)
+
+
+def test_exhaustive_wheel_sub_deck(evaluator, treys_evaluator):
+    sub_deck = [rank * 4 + suit for rank in (12, 0, 1, 2, 3) for suit in range(4)]
+    hands = list(itertools.combinations(sub_deck, 7))
+    assert len(hands) == 77520
+    assert_matches_treys(evaluator, treys_evaluator, hands)
+
+
+def test_random_full_deck_hands(evaluator, treys_evaluator):
+    rng = np.random.default_rng(2024)
+    hands = [rng.permutation(52)[:7] for _ in range(20000)]
+    assert_matches_treys(evaluator, treys_evaluator, hands)
+
+
+def test_scalar_and_batch_paths_agree(evaluator):
+    rng = np.random.default_rng(7)
+    hands = np.array([rng.permutation(52)[:7] for _ in range(5000)])
+    batch_scores = evaluator.evaluate_batch(hands).tolist()
+    assert [evaluator.evaluate_ids(hand) for hand in hands.tolist()] == batch_scores
+    cards = [[TREYS_CARDS[card_id] for card_id in hand] for hand in hands.tolist()]
+    assert [evaluator.evaluate(hand[2:], hand[:2]) for hand in cards] == batch_scores
+
+
+def test_board_state_and_tables_match_batch_evaluation(evaluator):
+    rng = np.random.default_rng(11)
+    for cards_needed in (0, 1, 2):
+        deck = rng.permutation(52)
+        prefix = deck[:5 - cards_needed]
+        remaining = deck[5 - cards_needed:]
+        tables = BoardTables(evaluator, prefix, cards_needed)
+        for _ in range(3):
+            deals = np.array([rng.permutation(remaining)[:cards_needed + 4] for _ in range(200)])
+            runouts = deals[:, :cards_needed]
+            combos = COMBO_INDEX[deals[:, cards_needed::2], deals[:, cards_needed + 1::2]]
+            expected = np.stack([
+                evaluator.evaluate_batch(np.concatenate([
+                    np.broadcast_to(prefix, (len(deals), len(prefix))), runouts, COMBO_CARDS[combos[:, seat]]
+                ], axis=1))
+                for seat in range(2)
+            ], axis=1)
+            assert (tables.scores(runouts, combos) == expected).all()
+            state = evaluator.board_state(prefix).extend(runouts)
+            assert (state.score_combos(combos) == expected).all()
+
+
+def test_combos_touching_the_board_score_dead(evaluator):
+    # Trip aces: combos holding a board ace would overflow the rank key table
+    prefix = np.array([51, 50, 49, 47])  # Ac Ad Ah Kc
+    tables = BoardTables(evaluator, prefix, 1)
+    runouts = np.array([[46], [48]])  # Kd, As
+    scores = tables.scores(runouts, np.broadcast_to(np.arange(len(COMBO_CARDS)), (2, len(COMBO_CARDS))))
+    for row, runout in enumerate(runouts[:, 0]):
+        board_mask = sum(1 << int(card) for card in prefix) | 1 << int(runout)
+        dead = (COMBO_MASKS & np.uint64(board_mask)) != 0
+        assert (scores[row, dead] == DEAD_SCORE).all()
+        assert (scores[row, ~dead] < DEAD_SCORE).all()
+
+
+def test_rejects_incomplete_hands(evaluator):
+    with pytest.raises(ValueError):
+        evaluator.evaluate(TREYS_CARDS[:3], TREYS_CARDS[3:5])
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from card_codec import cards_mask
+from hand_ranges import (
+    COMBO_CARDS, COMBO_CLASSES, COMBO_COUNT, COMBO_MASKS, OPPONENT_PROFILES, HandRange, RangeSampler,
+    compile_profile_ranges
+)
+from preflop_table import PreflopEquityTable, hand_class_name
+
+
+@pytest.fixture(scope="module")
+def profile_ranges():
+    return compile_profile_ranges(PreflopEquityTable.load_default())
+
+
+def test_combos_cover_every_pair_once():
+    assert len(COMBO_CARDS) == COMBO_COUNT
+    assert len(set(COMBO_MASKS.tolist())) == COMBO_COUNT
+
+
+def test_profiles_match_their_advertised_width(profile_ranges):
+    for profile in OPPONENT_PROFILES:
+        fraction = profile_ranges[profile.name].combo_count / COMBO_COUNT
+        assert profile.core_fraction < fraction < profile.outer_fraction
+
+
+def test_tight_range_holds_premiums_and_drops_trash(profile_ranges):
+    weights = profile_ranges["Tight-Passive"].weights
+    by_class = {hand_class_name(index): weights[COMBO_CLASSES == index].max() for index in range(169)}
+    assert by_class["AA"] == by_class["AKs"] == by_class["QQ"] == 1.0
+    assert by_class["72o"] == by_class["32o"] == 0.0
+
+
+def test_sampler_matches_weights_under_card_removal():
+    rng = np.random.default_rng(5)
+    weights = rng.random(COMBO_COUNT) * (rng.random(COMBO_COUNT) < 0.3)
+    dead_mask = cards_mask([0, 13, 51])
+    sampler = HandRange("test", weights).sampler(dead_mask)
+    draws = sampler.sample(np.zeros(400000, dtype=np.uint64), rng)
+    assert not (COMBO_MASKS[draws] & dead_mask).any()
+
+    expected = np.where(COMBO_MASKS & dead_mask, 0.0, weights)
+    expected /= expected.sum()
+    observed = np.bincount(draws, minlength=COMBO_COUNT) / len(draws)
+    assert np.abs(observed - expected).max() < 5 * np.sqrt(expected.max() / len(draws))
+
+
+def test_sampler_avoids_cards_dealt_in_each_row():
+    rng = np.random.default_rng(9)
+    sampler = RangeSampler(np.ones(COMBO_COUNT))
+    row_masks = COMBO_MASKS[rng.integers(0, COMBO_COUNT, size=10000)]
+    draws = sampler.sample(row_masks, rng)
+    assert not (COMBO_MASKS[draws] & row_masks).any()
@@ -0,0 +1,60 @@
+import pytest
+
+from cancellation import AnalysisCancelled, CancellationToken
+from parallel_simulation import ParallelSimulator
+from poker_engine import PokerEngine
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    simulator = ParallelSimulator(workers=2)
+    yield simulator
+    simulator.shutdown()
+
+
+def test_seeded_runs_are_reproducible_and_merge_all_chunks(simulator):
+    hole = [48, 44]  # As Ks
+    board = [40, 36, 1]  # Qs Js 2h
+
+    first = simulator.simulate_counts(hole, board, 2, 50001, seed=42)
+    second = simulator.simulate_counts(hole, board, 2, 50001, seed=42)
+    assert first == second
+    assert first[2] == 50001
+
+    engine = PokerEngine()
+    exact, _ = engine._combinatorial_analysis(hole, board, 2)
+    wins, ties, total = first
+    assert wins / total * 100 == pytest.approx(exact['win'], abs=1.0)
+
+
+def test_cancelled_run_stops_waiting_for_workers(simulator):
+    hole = [48, 44]
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(AnalysisCancelled):
+        simulator.simulate_counts(hole, [], 10, 200000, seed=1, cancel_token=token)
+
+
+def test_cancelled_run_only_simulates_started_chunks(simulator, monkeypatch):
+    executor = simulator._get_executor()
+    token = CancellationToken()
+    futures = []
+
+    class RecordingExecutor:
+        def submit(self, *args):
+            future = executor.submit(*args)
+            # Cancel as soon as the first chunk is done, while the others are queued
+            future.add_done_callback(lambda _: token.cancel())
+            futures.append(future)
+            return future
+
+    monkeypatch.setattr(simulator, "_get_executor", lambda: RecordingExecutor())
+    iterations = 400000
+    with pytest.raises(AnalysisCancelled) as cancelled:
+        simulator.simulate_counts([48, 44], [], 10, iterations, seed=3, cancel_token=token)
+
+    # Chunks that were not cancelled ran to the end in a worker
+    simulated = sum(future.result()[2] for future in futures if not future.cancelled())
+    assert any(future.cancelled() for future in futures)
+    assert simulated < iterations
+    assert cancelled.value.progress == pytest.approx(simulated / iterations)
@@ -0,0 +1,437 @@
+import pytest
+
+from cancellation import AnalysisCancelled, CancellationToken
+from poker_engine import Card, PokerEngine
+
+
+def cards(*codes):
+    """Build engine cards from short codes like 'Ah', 'Tc'"""
+    suits = {'h': 'hearts', 'd': 'diamonds', 'c': 'clubs', 's': 'spades'}
+    return [Card(rank=code[:-1], suit=suits[code[-1]]) for code in codes]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return PokerEngine()
+
+
+def test_exact_river_nuts_always_wins(engine):
+    result = engine.analyze_hand(
+        cards('Ts', '3c'), cards('As', 'Ks', 'Qs', 'Js', '2d'), 2, method="exact"
+    )
+    assert result.win_probability == 100.0
+    assert result.calculations.confidence == "exact"
+    assert result.calculations.method == "Exact Enumeration (990 combinations)"
+
+
+def test_exact_river_counts_board_ties(engine):
+    # Broadway on board: every holding without a flush or better chops
+    result = engine.analyze_hand(
+        cards('2c', '3d'), cards('As', 'Kd', 'Qh', 'Jc', 'Ts'), 2, method="exact"
+    )
+    assert result.win_probability == 0.0
+    assert result.tie_probability == 100.0
+
+
+def test_hand_strength_reads_ranks_and_suits(engine):
+    result = engine.analyze_hand(cards('Kh', 'Ah'), [], 2, seed=1)
+    assert result.hand_strength.description == "AK suited"
+    result = engine.analyze_hand(cards('Ah', 'Kh'), cards('Qh', 'Jh', '7h'), 2, seed=1)
+    assert result.hand_strength.description == "Hearts flush"
+    result = engine.analyze_hand(cards('Ah', 'Ad'), cards('Qh', 'Jc', '7s'), 2, seed=1)
+    assert result.hand_strength.description == "Pair of Aces"
+
+
+def test_auto_uses_exact_enumeration_on_turn(engine):
+    result = engine.analyze_hand(
+        cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c', '7d') + [None], 2
+    )
+    assert result.calculations.method == "Exact Enumeration (45,540 combinations)"
+    assert result.win_probability + result.tie_probability + result.lose_probability == pytest.approx(100.0)
+
+
+def test_exact_rejected_preflop(engine):
+    with pytest.raises(ValueError):
+        engine.analyze_hand(cards('Ah', 'Kh'), [None] * 5, 2, method="exact")
+
+
+def test_auto_enumerates_heads_up_flop(engine):
+    result = engine.analyze_hand(
+        cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None], 2
+    )
+    assert result.calculations.method == "Exact Enumeration (1,070,190 combinations)"
+    assert result.win_probability == 75.87
+    assert result.tie_probability == 0.93
+
+
+def test_multiway_flop_stays_on_monte_carlo(engine):
+    result = engine.analyze_hand(
+        cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None], 3, simulation_iterations=10000
+    )
+    assert result.calculations.method == "Monte Carlo (10,000 simulations)"
+
+
+def test_monte_carlo_agrees_with_exact_enumeration(engine):
+    hole, board = cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None]
+    exact = engine.analyze_hand(hole, board, 2, method="exact")
+    engine.equity_cache.clear()
+    sampled = engine.analyze_hand(hole, board, 2, simulation_iterations=200000, method="monte_carlo")
+    assert sampled.calculations.method == "Monte Carlo (200,000 simulations)"
+    assert sampled.win_probability == pytest.approx(exact.win_probability, abs=0.6)
+    assert sampled.tie_probability == pytest.approx(exact.tie_probability, abs=0.3)
+
+
+def test_auto_answers_preflop_from_table(engine):
+    result = engine.analyze_hand(cards('Ah', 'As'), [None] * 5, 2)
+    assert result.calculations.method.startswith("Preflop Table")
+    assert 84.5 < result.win_probability < 85.5
+
+
+def test_suit_isomorphic_spot_served_from_cache(engine):
+    engine.equity_cache.clear()
+    first = engine.analyze_hand(
+        cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None], 3, simulation_iterations=20000
+    )
+    second = engine.analyze_hand(
+        cards('Ks', 'As'), cards('Js', '2d', 'Qs') + [None, None], 3, simulation_iterations=10000
+    )
+    assert not first.calculations.cached
+    assert second.calculations.cached
+    assert second.calculations.simulation_time_ms == first.calculations.simulation_time_ms
+    assert second.calculations.method == "Monte Carlo (20,000 simulations)"
+    assert second.win_probability == first.win_probability
+
+    # A request for more iterations than were cached is recomputed
+    third = engine.analyze_hand(
+        cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None], 3, simulation_iterations=40000
+    )
+    assert not third.calculations.cached
+
+
+def test_target_precision_stops_early_and_reports_interval(engine):
+    engine.equity_cache.clear()
+    result = engine.analyze_hand(
+        cards('Ah', 'Ad'), cards('As', '7c', '2d') + [None, None], 4,
+        simulation_iterations=500000, target_precision=0.5
+    )
+    details = result.calculations
+    assert details.iterations < 500000
+    assert details.iterations % engine.SIMULATION_BATCH_SIZE == 0
+    low, high = details.win_interval
+    assert low <= result.win_probability <= high
+    assert (high - low) / 2 <= 0.5 + 0.01
+    # Interval bounds are rounded separately from the reported half-width
+    assert float(details.confidence.strip("±%")) == pytest.approx((high - low) / 2, abs=0.011)
+    assert details.method == f"Monte Carlo ({details.iterations:,} simulations)"
+
+
+def test_fixed_budget_reports_actual_interval(engine):
+    engine.equity_cache.clear()
+    result = engine.analyze_hand(
+        cards('9h', '8h'), cards('Th', 'Jc', '2d') + [None, None], 3, simulation_iterations=40000
+    )
+    assert result.calculations.iterations == 40000
+    low, high = result.calculations.win_interval
+    # Roughly 1.96 * sqrt(p(1-p)/n) for n = 40,000
+    assert 0.3 < (high - low) / 2 < 0.5
+
+
+def test_stratified_sampling_agrees_with_exact_and_is_tighter(engine):
+    hole, board = cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None]
+    exact = engine.analyze_hand(hole, board, 2, method="exact")
+    engine.equity_cache.clear()
+    stratified = engine.analyze_hand(
+        hole, board, 2, simulation_iterations=200000, method="monte_carlo", sampling="stratified"
+    )
+    details = stratified.calculations
+    assert details.method.startswith("Stratified Monte Carlo")
+    assert stratified.win_probability == pytest.approx(exact.win_probability, abs=0.6)
+    low, high = details.win_interval
+    assert low <= stratified.win_probability <= high
+    # Narrower than the binomial interval for the same number of deals
+    p = stratified.win_probability / 100
+    assert (high - low) / 2 < 196 * (p * (1 - p) / details.iterations) ** 0.5
+
+
+def test_unknown_sampling_mode_rejected(engine):
+    with pytest.raises(ValueError):
+        engine.analyze_hand(cards('Ah', 'Kh'), [None] * 5, 2, sampling="quasi")
+
+
+def test_progress_callback_reports_running_estimates(engine, monkeypatch):
+    monkeypatch.setattr(engine, "PROGRESS_INTERVAL_SECONDS", 0)
+    engine.equity_cache.clear()
+    snapshots = []
+    result = engine.analyze_hand(
+        cards('9h', '8h'), cards('Th', 'Jc', '2d') + [None, None], 3,
+        simulation_iterations=50000, on_progress=snapshots.append
+    )
+    assert [snapshot.iterations for snapshot in snapshots] == [10000, 20000, 30000, 40000, 50000]
+    assert all(snapshot.iterations_target == 50000 for snapshot in snapshots)
+    final = snapshots[-1]
+    assert final.win_probability == result.win_probability
+    assert final.win_interval == result.calculations.win_interval
+
+
+def test_batch_simulates_isomorphic_spots_once_and_keeps_order(engine):
+    engine.equity_cache.clear()
+    flop = cards('Th', 'Jc', '2d') + [None, None]
+    items = [
+        dict(hole_cards=cards('9h', '8h'), community_cards=flop, player_count=3, simulation_iterations=20000),
+        dict(hole_cards=cards('9h', '8h'), community_cards=flop, player_count=2, method="exact"),
+        dict(hole_cards=cards('Ah', 'Ad'), community_cards=[None] * 5, player_count=2, method="exact"),
+        dict(
+            hole_cards=cards('9s', '8s'), community_cards=cards('Ts', 'Jd', '2c') + [None, None],
+            player_count=3, simulation_iterations=20000
+        ),
+    ]
+    reported = []
+    outcomes = engine.analyze_batch(items, on_result=lambda index, outcome: reported.append(index))
+    assert reported == [0, 1, 2, 3]
+    first, exact, rejected, isomorphic = outcomes
+    assert isinstance(rejected, ValueError)
+    assert exact.calculations.confidence == "exact"
+    assert not first.calculations.cached
+    assert isomorphic.calculations.cached
+    assert isomorphic.win_probability == first.win_probability
+
+
+def test_batch_computes_duplicate_items_once_beyond_the_cache(engine):
+    # Seeded and analytic items bypass the equity cache but are still deduplicated
+    flop = cards('Th', 'Jc', '2d') + [None, None]
+    seeded = dict(community_cards=flop, player_count=3, simulation_iterations=20000, seed=5)
+    analytic = dict(community_cards=cards('Th', 'Jc', '2d', '7s') + [None], player_count=4, method="analytic")
+    items = [
+        dict(hole_cards=cards('9h', '8h'), **seeded),
+        dict(hole_cards=cards('9h', '8h'), **seeded),
+        dict(hole_cards=cards('9s', '8s'), community_cards=cards('Ts', 'Jd', '2c') + [None, None],
+             player_count=3, simulation_iterations=20000, seed=5),
+        dict(hole_cards=cards('Ah', 'Kh'), **analytic),
+        dict(hole_cards=cards('As', 'Ks'), community_cards=cards('Ts', 'Jc', '2d', '7h') + [None],
+             player_count=4, method="analytic"),
+    ]
+    first, duplicate, isomorphic_seeded, analytic_first, analytic_isomorphic = engine.analyze_batch(items)
+    assert not first.calculations.cached
+    assert duplicate.calculations.cached
+    assert duplicate.win_probability == first.win_probability
+    assert duplicate.calculations.seed == 5
+    # Seeded items only share identical cards, so this one is simulated from its own seed
+    assert not isomorphic_seeded.calculations.cached
+    assert not analytic_first.calculations.cached
+    assert analytic_isomorphic.calculations.cached
+    assert analytic_isomorphic.win_probability == analytic_first.win_probability
+    assert analytic_isomorphic.hand_strength == engine.analyze_hand(**items[4]).hand_strength
+
+
+def test_batch_does_not_share_isomorphic_spots_with_custom_ranges(engine):
+    # The range names suited combos, so the two spots are not equivalent
+    ranges = ["AsKs, 2s2d"]
+    items = [
+        dict(hole_cards=cards('Ah', 'Kh'), community_cards=cards('Qh', 'Jh', '2c') + [None, None],
+             player_count=2, simulation_iterations=20000, custom_ranges=ranges),
+        dict(hole_cards=cards('As', 'Ks'), community_cards=cards('Qs', 'Js', '2d') + [None, None],
+             player_count=2, simulation_iterations=20000, custom_ranges=ranges),
+    ]
+    first, overlapping = engine.analyze_batch(items)
+    assert not first.calculations.cached
+    assert isinstance(overlapping, ValueError)
+
+
+def test_batch_items_are_checked_before_any_calculation(engine):
+    flop = cards('Th', 'Jc', '2d') + [None, None]
+    valid = dict(hole_cards=cards('9h', '8h'), community_cards=flop, player_count=2)
+    engine.check_batch_item(valid)
+    with pytest.raises(ValueError, match="Exact enumeration"):
+        engine.check_batch_item(dict(valid, community_cards=cards('Th') + [None] * 4, method="exact"))
+    with pytest.raises(ValueError, match="no combos left"):
+        engine.check_batch_item(dict(valid, custom_ranges=["9h8h"]))
+    with pytest.raises(ValueError, match="latency budget"):
+        engine.check_batch_item(dict(valid, method="exact", max_latency_ms=50))
+
+
+def test_opponent_profiles_deal_from_weighted_ranges(engine):
+    hole, board = cards('Tc', '9c'), [None] * 5
+    random_opponent = engine.analyze_hand(hole, board, 2, simulation_iterations=50000)
+    tight_opponent = engine.analyze_hand(
+        hole, board, 2, simulation_iterations=50000, opponent_profiles=["Tight-Passive"]
+    )
+    assert tight_opponent.calculations.method == "Monte Carlo (50,000 simulations vs opponent ranges)"
+    assert not tight_opponent.calculations.cached
+    assert [item.profile for item in tight_opponent.opponent_ranges] == ["Tight-Passive"]
+    # A speculative hand does much worse against a premium-heavy range than against any two cards
+    assert tight_opponent.win_probability < random_opponent.win_probability - 8
+
+
+def test_opponent_profiles_require_one_profile_per_opponent(engine):
+    with pytest.raises(ValueError):
+        engine.analyze_hand(cards('Ah', 'Kh'), [None] * 5, 3, opponent_profiles=["Tight-Passive"])
+    with pytest.raises(ValueError):
+        engine.analyze_hand(
+            cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None], 2,
+            method="exact", opponent_profiles=["Tight-Passive"]
+        )
+
+
+def test_custom_ranges_are_compiled_from_notation(engine):
+    result = engine.analyze_hand(
+        cards('Tc', '9c'), [None] * 5, 3, simulation_iterations=20000,
+        custom_ranges=["QQ+, AKs", "22+, A2s+, KTo+, QJs"]
+    )
+    assert [item.profile for item in result.opponent_ranges] == ["Custom", "Custom"]
+    assert result.opponent_ranges[0].likely_holdings == ["QQ+", "AKs"]
+    with pytest.raises(ValueError):
+        engine.analyze_hand(cards('Tc', '9c'), [None] * 5, 2, custom_ranges=["QQ+ AKx"])
+
+
+def test_seat_equity_splits_pots_fractionally(engine):
+    result = engine.analyze_seats(
+        [cards('2h', '3s'), cards('4h', '5s'), cards('6h', '7d')],
+        cards('Ac', 'Kc', 'Qd', 'Jh', 'Ts')
+    )
+    assert result.calculations.confidence == "exact"
+    assert [seat.equity for seat in result.seats] == [33.33, 33.33, 33.33]
+    assert all(seat.tie_probability == 100.0 for seat in result.seats)
+
+
+def test_seat_equity_matches_hero_analysis(engine):
+    hole, board = cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c') + [None, None]
+    exact = engine.analyze_hand(hole, board, 2, method="exact")
+    result = engine.analyze_seats([hole, None], board, simulation_iterations=200000)
+    hero, villain = result.seats
+    assert hero.hole_cards is not None and villain.hole_cards is None
+    assert hero.equity == pytest.approx(exact.win_probability + exact.tie_probability / 2, abs=0.6)
+    assert hero.equity + villain.equity == pytest.approx(100.0, abs=0.02)
+
+
+def test_seat_equity_rejects_shared_cards(engine):
+    with pytest.raises(ValueError):
+        engine.analyze_seats([cards('Ah', 'Kh'), cards('Ah', 'Qd')], [])
+
+
+def test_early_exit_kernel_matches_full_multiway_scoring(engine):
+    hole, board = cards('7c', '7d'), cards('Qh', '7h', '2h') + [None, None]
+    engine.equity_cache.clear()
+    sampled = engine.analyze_hand(hole, board, 6, simulation_iterations=200000, method="monte_carlo")
+    hero = engine.analyze_seats([hole] + [None] * 5, board, simulation_iterations=200000).seats[0]
+    assert sampled.win_probability == pytest.approx(hero.win_probability, abs=0.6)
+    assert sampled.tie_probability == pytest.approx(hero.tie_probability, abs=0.3)
+
+
+def test_seed_is_recorded_and_reproduces_results(engine):
+    hole, board = cards('9s', '8s'), cards('Ts', '7d', '2c') + [None, None]
+    first = engine.analyze_hand(hole, board, 6, simulation_iterations=20000, seed=123)
+    second = engine.analyze_hand(hole, board, 6, simulation_iterations=20000, seed=123)
+    assert first.calculations.seed == second.calculations.seed == 123
+    assert (first.win_probability, first.tie_probability) == (second.win_probability, second.tie_probability)
+    engine.equity_cache.clear()
+    unseeded = engine.analyze_hand(hole, board, 6, simulation_iterations=20000)
+    assert isinstance(unseeded.calculations.seed, int)
+    exact = engine.analyze_hand(hole, board, 2, method="exact")
+    assert exact.calculations.seed is None
+
+
+def test_analytic_multiway_matches_monte_carlo(engine):
+    hole, board = cards('9s', '9h'), cards('Qh', 'Jd', '3s', '7c') + [None]
+    analytic = engine.analyze_hand(hole, board, 8, method="analytic")
+    assert analytic.calculations.method == "Analytic Multiway (46 boards)"
+    assert analytic.calculations.seed is None
+    sampled = engine.analyze_hand(hole, board, 8, simulation_iterations=200000, method="monte_carlo")
+    assert analytic.win_probability == pytest.approx(sampled.win_probability, abs=0.6)
+    assert analytic.tie_probability == pytest.approx(sampled.tie_probability, abs=0.3)
+
+
+def test_analytic_multiway_requires_three_players(engine):
+    with pytest.raises(ValueError):
+        engine.analyze_hand(cards('Ah', 'Kh'), cards('Qh', 'Jh', '2c'), 2, method="analytic")
+
+
+def test_hybrid_sampling_enumerates_runouts(engine):
+    hole, board = cards('9s', '9h'), cards('Qh', 'Jd', '3s', '7c') + [None]
+    engine.equity_cache.clear()
+    hybrid = engine.analyze_hand(hole, board, 4, simulation_iterations=46000, method="monte_carlo", sampling="hybrid")
+    assert hybrid.calculations.method == "Hybrid Monte Carlo (46 runouts x 1,000 simulations)"
+    assert hybrid.calculations.iterations == 46000
+    analytic = engine.analyze_hand(hole, board, 4, method="analytic")
+    assert hybrid.win_probability == pytest.approx(analytic.win_probability, abs=1.0)
+    with pytest.raises(ValueError):
+        engine.analyze_hand(hole, [None] * 5, 4, sampling="hybrid")
+
+
+def test_latency_budget_plans_the_calculation(engine):
+    hole, board = cards('Ah', 'Kh'), cards('Qh', '7c', '2d')
+    engine.equity_cache.clear()
+    exact = engine.analyze_hand(hole, board, 2, max_latency_ms=1000)
+    assert exact.calculations.method.startswith("Exact Enumeration")
+    assert "[planner: exact, est." in exact.calculations.method
+    tight = engine.analyze_hand(hole, board, 6, max_latency_ms=20)
+    assert "planner: " in tight.calculations.method
+    assert tight.calculations.iterations < 100000
+    reused = engine.analyze_hand(hole, board, 2, max_latency_ms=1000)
+    assert reused.calculations.cached
+    assert "[planner: cache, est." in reused.calculations.method
+    with pytest.raises(ValueError):
+        engine.analyze_hand(hole, board, 2, method="exact", max_latency_ms=1000)
+
+
+def test_time_budget_stops_simulation_at_deadline(engine):
+    hole, board = cards('Ah', 'Kh'), [None] * 5
+    result = engine.analyze_hand(hole, board, 6, simulation_iterations=10 ** 7, method="monte_carlo", time_budget_ms=50)
+    assert result.calculations.method.endswith("in 50 ms time budget)")
+    assert engine.SIMULATION_BATCH_SIZE <= result.calculations.iterations < 10 ** 7
+    assert result.calculations.win_interval[0] < result.win_probability < result.calculations.win_interval[1]
+    with pytest.raises(ValueError):
+        engine.analyze_hand(hole, board, 6, sampling="stratified", time_budget_ms=50)
+
+
+def test_cancellation_stops_simulation_between_batches(engine):
+    hole, board = cards('Ah', 'Kh'), [None] * 5
+    token = CancellationToken()
+    reports = []
+
+    def cancel_after_first_batch(progress):
+        reports.append(progress)
+        token.cancel()
+
+    with pytest.raises(AnalysisCancelled) as cancelled:
+        engine.analyze_hand(
+            hole, board, 6, simulation_iterations=500000, method="monte_carlo",
+            on_progress=cancel_after_first_batch, cancel_token=token
+        )
+    assert len(reports) == 1
+    assert 0 < cancelled.value.progress < 0.1
+    with pytest.raises(AnalysisCancelled):
+        engine.analyze_hand(cards('9s', '9h'), cards('Qh', 'Jd', '3s'), 6, method="analytic", cancel_token=token)
+
+
+@pytest.mark.parametrize("board", [('As', 'Ad', 'Kc'), ('As', 'Ad', 'Ac', 'Kd')])
+def test_exact_enumeration_on_paired_ace_boards(engine, board):
+    # Holdings reusing a board ace must be skipped, not looked up
+    hole = cards('2h', '7c')
+    exact = engine.analyze_hand(hole, cards(*board), 2, method="exact")
+    sampled = engine.analyze_hand(hole, cards(*board), 2, simulation_iterations=200000, method="monte_carlo")
+    assert exact.win_probability == pytest.approx(sampled.win_probability, abs=1.0)
+    assert exact.tie_probability == pytest.approx(sampled.tie_probability, abs=1.0)
+
+
+@pytest.mark.parametrize("board", [('As', 'Ad', 'Ac', 'Kd'), ('As', 'Ad', 'Ac', 'Kd', 'Qd')])
+def test_simulations_on_trip_ace_boards(engine, board):
+    hole, board = cards('2h', '7c'), cards(*board)
+    results = [
+        engine.analyze_hand(hole, board, 3, simulation_iterations=20000, method="monte_carlo", sampling=sampling, seed=5)
+        for sampling in ("random", "stratified", "hybrid")
+    ]
+    seats = engine.analyze_seats([hole, None, None], board, simulation_iterations=20000, seed=5)
+    for result in results:
+        assert result.win_probability + result.tie_probability + result.lose_probability == pytest.approx(100, abs=0.1)
+        assert result.tie_probability == pytest.approx(results[0].tie_probability, abs=2.0)
+    assert sum(seat.equity for seat in seats.seats) == pytest.approx(100, abs=0.1)
+
+
+def test_analytic_multiway_on_trip_ace_boards_reports_model_error(engine):
+    river = engine.analyze_hand(cards('2h', '7c'), cards('As', 'Ad', 'Ac', 'Kd', 'Qd'), 4, method="analytic")
+    assert river.calculations.confidence == f"±{engine.ANALYTIC_MODEL_ERROR[4]:.2f}%"
+    low, high = river.calculations.win_interval
+    assert low <= river.win_probability <= high
+    # Preflop boards are sampled, and some hold three aces
+    preflop = engine.analyze_hand(cards('Ts', '9s'), [None] * 5, 3, method="analytic", seed=4)
+    assert preflop.calculations.seed == 4
@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+
+from preflop_table import (
+    HAND_CLASS_COUNT, PreflopEquityTable, hand_class_index, hand_class_name, representative_hand
+)
+
+
+def test_every_starting_hand_maps_to_one_of_169_classes():
+    combos_per_class = {}
+    for hand in itertools.combinations(range(52), 2):
+        index = hand_class_index(hand)
+        combos_per_class[index] = combos_per_class.get(index, 0) + 1
+    assert len(combos_per_class) == HAND_CLASS_COUNT
+    assert sorted(set(combos_per_class.values())) == [4, 6, 12]
+
+
+def test_representative_hands_round_trip():
+    for index in range(HAND_CLASS_COUNT):
+        assert hand_class_index(representative_hand(index)) == index
+    assert hand_class_name(hand_class_index((48, 44))) == "AKs"
+    assert hand_class_name(hand_class_index((48, 45))) == "AKo"
+    assert hand_class_name(hand_class_index((48, 49))) == "AA"
+
+
+def test_save_and_load_round_trip(tmp_path):
+    probabilities = np.random.default_rng(3).random((HAND_CLASS_COUNT, 9, 2)) / 2
+    PreflopEquityTable(probabilities, 12345).save(tmp_path / "table.bin")
+
+    table = PreflopEquityTable.load(tmp_path / "table.bin")
+    assert table.trials == 12345
+    np.testing.assert_array_equal(table.probabilities, probabilities)
+
+
+def test_shipped_table_is_sane():
+    table = PreflopEquityTable.load()
+    aces = table.lookup((48, 49), 2)
+    assert 84.5 < aces['win'] < 85.5
+    # Equity of every hand shrinks as opponents are added
+    assert np.all(np.diff(table.probabilities[:, :, 0], axis=1) < 0)
@@ -0,0 +1,44 @@
+import pytest
+
+from card_codec import cards_mask
+from hand_ranges import COMBO_CLASSES
+from preflop_table import hand_class_name
+from range_notation import compile_range, normalize_range
+
+
+def classes(hand_range):
+    return {hand_class_name(index) for index in set(COMBO_CLASSES[hand_range.weights > 0].tolist())}
+
+
+def test_standard_notation_expands_to_combos():
+    hand_range = compile_range("22+, A2s+, KTo+, QJs")
+    # 13 pairs * 6 + 12 suited aces * 4 + 3 offsuit kings * 12 + 4
+    assert hand_range.combo_count == 78 + 48 + 36 + 4
+    assert {"22", "AA", "A2s", "AKs", "KTo", "KQo", "QJs"} <= classes(hand_range)
+    assert not {"KTs", "K9o", "QJo", "A2o"} & classes(hand_range)
+
+
+def test_spans_weights_and_specific_combos():
+    assert classes(compile_range("77-99")) == {"77", "88", "99"}
+    assert classes(compile_range("A2s-A4s")) == {"A2s", "A3s", "A4s"}
+    assert compile_range("AhKh").combo_count == 1
+    assert compile_range("AK:0.5").combo_count == 8
+    # Later items override earlier ones
+    assert compile_range("AKs, AKs:0.25").combo_count == 1
+
+
+def test_spelling_is_normalized_and_memoized():
+    assert normalize_range(" a10s,  kto+ ajs:0.50") == "ATs,KTo+,AJs:0.5"
+    assert compile_range("qq+ aks") is compile_range("QQ+, AKs")
+
+
+def test_card_removal_masks_blocked_combos():
+    hand_range = compile_range("AA")
+    assert (hand_range.available(cards_mask([48])) > 0).sum() == 3
+    assert len(hand_range.bitmask) == 166
+
+
+@pytest.mark.parametrize("notation", ["", "XX", "AAs", "AhAh", "AK:2", "A2s-K5s", "22-A2s"])
+def test_malformed_notation_is_rejected(notation):
+    with pytest.raises(ValueError):
+        compile_range(notation)
@@ -0,0 +1,46 @@
+import random
+
+from hand_evaluator import TREYS_TO_ID
+from spot_canonicalizer import CanonicalSpot, canonicalize_spot
+from treys import Card as TreysCard
+
+
+def ids(*codes):
+    return [TREYS_TO_ID[TreysCard.new(code)] for code in codes]
+
+
+def test_suit_relabelled_spots_share_a_key():
+    hearts = canonicalize_spot(ids('Ah', 'Kh'), ids('Qh', 'Jh', '2c') + [None, None], 2)
+    spades = canonicalize_spot(ids('As', 'Ks'), ids('Qs', 'Js', '2d') + [None, None], 2)
+    assert hearts == spades
+    assert hearts.key == spades.key
+
+
+def test_card_order_is_irrelevant():
+    first = canonicalize_spot(ids('Ah', 'Kd'), ids('Qh', '7c', '2c', '9s'), 3)
+    second = canonicalize_spot(ids('Kd', 'Ah'), ids('9s', '2c', 'Qh', '7c'), 3)
+    assert first.key == second.key
+
+
+def test_different_spots_get_different_keys():
+    suited = canonicalize_spot(ids('Ah', 'Kh'), ids('Qh', 'Jh', '2c'), 2)
+    offsuit = canonicalize_spot(ids('Ah', 'Kd'), ids('Qh', 'Jh', '2c'), 2)
+    three_way = canonicalize_spot(ids('Ah', 'Kh'), ids('Qh', 'Jh', '2c'), 3)
+    assert len({suited.key, offsuit.key, three_way.key}) == 3
+
+
+def test_preflop_has_169_classes():
+    keys = {
+        canonicalize_spot([first, second], [None] * 5, 2).key
+        for first in range(52) for second in range(first + 1, 52)
+    }
+    assert len(keys) == 169
+
+
+def test_key_round_trips_and_fits_in_64_bits():
+    rng = random.Random(11)
+    for board_length in (0, 3, 4, 5):
+        cards = rng.sample(range(52), 2 + board_length)
+        spot = canonicalize_spot(cards[:2], cards[2:], rng.randint(2, 10))
+        assert spot.key < 2 ** 63
+        assert CanonicalSpot.from_key(spot.key) == spot